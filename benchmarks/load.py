@@ -0,0 +1,233 @@
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+# Every route of main.py, including the static files that make up the Vue app. /personal_data is left out, it
+# answers a client with 429 after a burst of ten requests (see ratelimit.py), so only the limiter would be measured.
+RATE_LIMITED_ROUTES = ("/personal_data",)
+DEFAULT_ROUTES = (
+    "/",
+    "/elements/de",
+    "/experiences/de",
+    "/education/de",
+    "/volunteering/de",
+    "/trivia/de",
+    "/bundle/de",
+    "/search/de?q=informatik",
+    "/timeline/de?from=2018&to=2019",
+    "/js/main.js",
+    "/css/output.css",
+    "/dist/vue.esm-browser.js",
+)
+
+
+class ASGIClient:
+    """Drives the ASGI app directly, so that only the app itself is measured"""
+
+    def __init__(self, app, headers: list[tuple[bytes, bytes]]):
+        self.app = app
+        self.headers = [(b"host", b"benchmark"), *headers]
+
+    async def get(self, target: str) -> tuple[int, int]:
+        path, _, query = target.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": self.headers,
+            "client": ("127.0.0.1", 50000),
+            "server": ("benchmark", 80),
+        }
+        response = {"status": 0, "size": 0}
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return response["status"], response["size"]
+
+    async def close(self):
+        pass
+
+
+class HTTPClient:
+    """A minimal HTTP/1.1 client with one keep-alive connection, so that a real server can be measured"""
+
+    def __init__(self, url: str, headers: list[tuple[bytes, bytes]]):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.headers = b"".join(name + b": " + value + b"\r\n" for name, value in headers)
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def get(self, target: str) -> tuple[int, int]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(
+            f"GET {target} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n".encode() + self.headers + b"\r\n"
+        )
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        size = 0
+        if headers.get("transfer-encoding") == "chunked":
+            while (chunk_size := int((await self.reader.readline()).split(b";")[0], 16)) > 0:
+                size += len(await self.reader.readexactly(chunk_size + 2)) - 2
+            await self.reader.readline()
+        elif status not in (204, 304):
+            size = len(await self.reader.readexactly(int(headers.get("content-length", 0))))
+
+        if headers.get("connection") == "close":
+            await self.close()
+        return status, size
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = self.reader = None
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def benchmark_route(make_client, route: str, requests: int, concurrency: int, warmup: int) -> dict:
+    clients = [make_client() for _ in range(concurrency)]
+    for _ in range(warmup):
+        await clients[0].get(route)
+
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    sizes: list[int] = []
+    remaining = requests
+
+    async def worker(client):
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            status, size = await client.get(route)
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+            sizes.append(size)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(client) for client in clients))
+    elapsed = time.perf_counter() - started
+    for client in clients:
+        await client.close()
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "bytes": statistics.fmean(sizes),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Returns a description of every route that got slower than the baseline allows"""
+    regressions = []
+    for route, result in results["routes"].items():
+        previous = baseline.get("routes", {}).get(route)
+        if previous is None:
+            continue
+        if result["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+            regressions.append(f"{route}: p95 {previous['p95_ms']:.3f} ms -> {result['p95_ms']:.3f} ms")
+        if result["throughput"] < previous["throughput"] * (1 - threshold):
+            regressions.append(f"{route}: throughput {previous['throughput']:.0f}/s -> {result['throughput']:.0f}/s")
+    return regressions
+
+
+async def run(arguments) -> dict:
+    headers = [(b"accept-encoding", arguments.accept_encoding.encode())]
+    if arguments.url:
+        def make_client():
+            return HTTPClient(arguments.url, headers)
+    else:
+        from main import app
+
+        def make_client():
+            return ASGIClient(app, headers)
+
+    results = {
+        "target": arguments.url or "asgi",
+        "concurrency": arguments.concurrency,
+        "accept_encoding": arguments.accept_encoding,
+        "routes": {},
+    }
+    routes = arguments.routes or DEFAULT_ROUTES
+    if not arguments.routes:
+        print(f"Leaving out the rate limited {', '.join(RATE_LIMITED_ROUTES)}, name them explicitly to measure the limiter")
+    else:
+        for route in routes:
+            if route.startswith(RATE_LIMITED_ROUTES):
+                print(f"{route} is rate limited, everything after the first ten requests measures 429 responses")
+    print(f"{'route':<34}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'bytes':>10}  statuses")
+    for route in routes:
+        result = await benchmark_route(make_client, route, arguments.requests, arguments.concurrency, arguments.warmup)
+        results["routes"][route] = result
+        print(f"{route:<34}{result['throughput']:>10.0f}{result['p50_ms']:>10.3f}{result['p95_ms']:>10.3f}"
+              f"{result['p99_ms']:>10.3f}{result['bytes']:>10.0f}  {result['statuses']}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures throughput and latency of every route")
+    parser.add_argument("routes", nargs="*", help="the routes to request, all of them by default")
+    parser.add_argument("--url", help="benchmark a running server (e.g. http://127.0.0.1:8000) instead of the app in-process")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--accept-encoding", default="gzip, deflate, br")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare with the results in this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed regression, 0.10 means 10 %%")
+    arguments = parser.parse_args()
+
+    results = asyncio.run(run(arguments))
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if arguments.baseline:
+        with open(arguments.baseline) as file:
+            regressions = compare(results, json.load(file), arguments.threshold)
+        if regressions:
+            print("\nRegressions compared to the baseline:", *regressions, sep="\n  ")
+            sys.exit(1)
+        print(f"\nNo route regressed by more than {arguments.threshold:.0%} compared to the baseline")
@@ -0,0 +1,102 @@
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+from benchmarks.load import DEFAULT_ROUTES
+
+# Linux only, smaps_rollup sums up the memory of all mappings of a process
+FIELDS = ("Rss", "Pss", "Private_Clean", "Private_Dirty")
+
+
+def read_memory(pid: int) -> dict[str, int]:
+    """Memory of a process in KiB, USS is the memory that would be freed if it exited"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as file:
+        for line in file:
+            name, _, value = line.partition(":")
+            if name in FIELDS:
+                values[name] = int(value.split()[0])
+    return {"rss": values["Rss"], "pss": values["Pss"], "uss": values["Private_Clean"] + values["Private_Dirty"]}
+
+
+def children(pid: int) -> list[int]:
+    found = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children") as file:
+            found.extend(int(child) for child in file.read().split())
+    return found
+
+
+def wait_until_serving(port: int, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/elements/de", timeout=1).read()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+def warm_up(port: int, rounds: int):
+    """Requests every route a few times, so that every worker has touched the data it serves"""
+    for _ in range(rounds):
+        for route in DEFAULT_ROUTES:
+            request = urllib.request.Request(f"http://127.0.0.1:{port}{route}", headers={"Accept-Encoding": "br"})
+            try:
+                urllib.request.urlopen(request, timeout=5).read()
+            except OSError:
+                pass
+
+
+def measure(label: str, command: list[str], port: int, rounds: int) -> dict:
+    environment = {**os.environ, "CV_CONTENT_RELOAD_INTERVAL": "0"}
+    process = subprocess.Popen(command, env=environment, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_serving(port)
+        warm_up(port, rounds)
+        # uvicorn --workers spawns its workers through multiprocessing, which adds a resource tracker in between
+        processes = [process.pid, *children(process.pid)]
+        processes += [grandchild for child in processes[1:] for grandchild in children(child)]
+        memory = {pid: read_memory(pid) for pid in processes}
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=30)
+
+    print(f"\n{label}")
+    print(f"{'pid':>8}{'RSS MiB':>10}{'PSS MiB':>10}{'USS MiB':>10}")
+    for pid, values in memory.items():
+        print(f"{pid:>8}{values['rss'] / 1024:>10.1f}{values['pss'] / 1024:>10.1f}{values['uss'] / 1024:>10.1f}")
+    total = sum(values["pss"] for values in memory.values())
+    print(f"{'total':>8}{'':>10}{total / 1024:>10.1f}")
+    return {"processes": len(memory), "pss": total}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compares the memory of the preforked workers of serve.py with independently started workers",
+    )
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rounds", type=int, default=20, help="how often every route is requested before measuring")
+    arguments = parser.parse_args()
+
+    workers = str(arguments.workers)
+    port = str(arguments.port)
+    preforked = measure(
+        f"python -m serve --workers {workers}",
+        [sys.executable, "-m", "serve", "--workers", workers, "--port", port],
+        arguments.port, arguments.rounds,
+    )
+    independent = measure(
+        f"uvicorn main:app --workers {workers}",
+        [sys.executable, "-m", "uvicorn", "main:app", "--workers", workers, "--port", port],
+        arguments.port, arguments.rounds,
+    )
+    print(f"\nPSS of all processes: {preforked['pss'] / 1024:.1f} MiB preforked, "
+          f"{independent['pss'] / 1024:.1f} MiB independent")
@@ -0,0 +1,63 @@
+import argparse
+import json
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+
+import cache
+from content import ContentStore
+from db import Language
+from storage import FileStorage
+
+
+def fastapi_default(content) -> bytes:
+    """What FastAPI does for a route without a response class: jsonable_encoder, then JSONResponse.render"""
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def stdlib_fallback(content) -> bytes:
+    orjson, cache.orjson = cache.orjson, None
+    try:
+        return cache.dump_json(content)
+    finally:
+        cache.orjson = orjson
+
+
+SERIALIZERS = {"jsonable_encoder + json": fastapi_default, "dump_json (json)": stdlib_fallback}
+if cache.orjson is not None:
+    SERIALIZERS["dump_json (orjson)"] = cache.dump_json
+
+
+def measure(serializer, content, number: int) -> float:
+    return min(timeit.repeat(lambda: serializer(content), number=number, repeat=5)) / number
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares FastAPI's JSON encoding with the one of cache.dump_json")
+    parser.add_argument("--number", type=int, default=200, help="serializations per measurement")
+    arguments = parser.parse_args()
+
+    content = ContentStore(FileStorage("content")).load()
+    payloads = {
+        f"elements/{language.value}": {key: element.content[language] for key, element in content.elements.items()}
+        for language in Language
+    }
+    for section, entries in content.sections.items():
+        for language in Language:
+            payloads[f"{section}/{language.value}"] = entries[language]
+
+    print(f"{'payload':<20}{'bytes':>8}" + "".join(f"{name + ' µs':>28}" for name in SERIALIZERS))
+    totals = dict.fromkeys(SERIALIZERS, 0.0)
+    for name, payload in payloads.items():
+        expected = fastapi_default(payload)
+        row = f"{name:<20}{len(expected):>8}"
+        for serializer_name, serializer in SERIALIZERS.items():
+            if serializer(payload) != expected:
+                raise SystemExit(f"{serializer_name} produced different bytes for {name}")
+            duration = measure(serializer, payload, arguments.number)
+            totals[serializer_name] += duration
+            row += f"{duration * 1e6:>28.1f}"
+        print(row)
+    print(f"{'total':<28}" + "".join(f"{duration * 1e6:>28.1f}" for duration in totals.values()))
@@ -0,0 +1,35 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Imports the app the same way uvicorn does and reports how long it took until it could serve requests
+MEASURE = "import time; started = time.perf_counter(); import main; print(time.perf_counter() - started)"
+
+
+def measure(runs: int, snapshot_path: str) -> list[float]:
+    environment = {**os.environ, "CV_CONTENT_SNAPSHOT": snapshot_path}
+    durations = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", MEASURE], env=environment, check=True, capture_output=True, text=True,
+        ).stdout
+        durations.append(float(output.strip().splitlines()[-1]))
+    return durations
+
+
+def report(label: str, durations: list[float]):
+    print(f"{label:<22} median {statistics.median(durations) * 1000:8.1f} ms   "
+          f"min {min(durations) * 1000:8.1f} ms   max {max(durations) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares starting the app with and without a content snapshot")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--snapshot", default=os.path.join("content", "snapshot.marshal"))
+    arguments = parser.parse_args()
+
+    subprocess.run([sys.executable, "-m", "snapshot", arguments.snapshot], check=True)
+    report("full validation", measure(arguments.runs, ""))
+    report("from snapshot", measure(arguments.runs, arguments.snapshot))
@@ -0,0 +1,181 @@
+import gzip
+import hashlib
+import json
+from collections import OrderedDict
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Callable, Hashable, Optional
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, without it we only offer gzip
+    brotli = None
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the json module produces the same output, only slower
+    orjson = None
+
+# Bodies smaller than this are not worth the overhead of compressing them
+MINIMUM_COMPRESSION_SIZE = 256
+
+# Compressed variants loaded from a snapshot (see snapshot.py), keyed by the digest of the uncompressed body.
+# Only set while a Site is built from the Content they belong to, so they go away together with that Content.
+precompressed: ContextVar[dict[str, dict[str, bytes]]] = ContextVar("precompressed", default={})
+
+
+def encode_default(value: Any) -> Any:
+    """
+    Called for the values the serializers don't know themselves. Pydantic models are turned into dicts directly,
+    instead of walking every value of them like jsonable_encoder does.
+    """
+    if isinstance(value, BaseModel):
+        return value.dict(by_alias=True)
+    return jsonable_encoder(value)
+
+
+def dump_json(content: Any) -> bytes:
+    """Serializes content to exactly the same bytes as FastAPI's default JSONResponse does, just faster"""
+    if orjson is not None:
+        # Element contents are keyed by the Language enum, which orjson only accepts with OPT_NON_STR_KEYS
+        return orjson.dumps(content, default=encode_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        default=encode_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """The default response class of the app, renders the same JSON as JSONResponse through dump_json"""
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+def compress(body: bytes) -> dict[str, bytes]:
+    """Returns all compressed variants of body that are actually smaller than the original"""
+    variants: dict[str, bytes] = {}
+    if len(body) < MINIMUM_COMPRESSION_SIZE:
+        return variants
+
+    candidates = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        candidates["br"] = brotli.compress(body, quality=11)
+
+    for encoding, compressed in candidates.items():
+        if len(compressed) < len(body):
+            variants[encoding] = compressed
+    return variants
+
+
+@lru_cache(maxsize=128)
+def parse_accept_encoding(accept_encoding: str) -> frozenset[str]:
+    """Returns the content-codings a client accepts, ignoring the ones it explicitly refuses with q=0"""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, parameters = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = parameters.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding)
+    return frozenset(accepted)
+
+
+def preferred_encoding(accept_encoding: str, available) -> Optional[str]:
+    """Picks the smallest available encoding the client accepts, brotli beats gzip"""
+    accepted = parse_accept_encoding(accept_encoding)
+    for encoding in ("br", "gzip"):
+        if encoding in available and (encoding in accepted or "*" in accepted):
+            return encoding
+    return None
+
+
+def etag_matches(if_none_match: str, etags) -> bool:
+    """Implements the weak comparison that RFC 9110 demands for If-None-Match"""
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in etags:
+            return True
+    return False
+
+
+class CachedResponse:
+    """
+    A response body that has been serialized and compressed ahead of time, so that serving it only
+    means picking the right variant
+    """
+    __slots__ = ("body", "media_type", "digest", "etag", "variants", "etags", "headers")
+
+    def __init__(self, body: bytes, media_type: str = "application/json", cache_control: str = "no-cache"):
+        self.body = body
+        self.media_type = media_type
+        self.digest = digest = hashlib.sha256(body).hexdigest()[:32]
+        # Every representation needs its own strong ETag, otherwise caches could mix up the encodings
+        self.etag = f'"{digest}"'
+        self.variants: dict[Optional[str], tuple[bytes, str]] = {None: (body, self.etag)}
+        compressed_variants = precompressed.get().get(digest)
+        if compressed_variants is None:
+            compressed_variants = compress(body)
+        for encoding, compressed in compressed_variants.items():
+            self.variants[encoding] = (compressed, f'"{digest}-{encoding}"')
+        self.etags = frozenset(etag for _, etag in self.variants.values())
+        self.headers = {"Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+
+    @classmethod
+    def from_content(cls, content: Any, **kwargs) -> "CachedResponse":
+        return cls(dump_json(content), **kwargs)
+
+    def respond(self, request: Request) -> Response:
+        """Answers the request with the best variant or a 304 if the client already has it"""
+        encoding = preferred_encoding(request.headers.get("accept-encoding", ""), self.variants)
+        body, etag = self.variants[encoding]
+        headers = dict(self.headers)
+        headers["ETag"] = etag
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None and etag_matches(if_none_match, self.etags):
+            return Response(status_code=304, headers=headers)
+
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return Response(body, media_type=self.media_type, headers=headers)
+
+
+class LRUCache:
+    """A bounded mapping that forgets the least recently used entry once it is full"""
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.entries: OrderedDict = OrderedDict()
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        try:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        except KeyError:
+            pass
+        value = build()
+        self.entries[key] = value
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return value
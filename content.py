@@ -0,0 +1,175 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from typing import TYPE_CHECKING, Callable, Hashable, Optional
+
+from pydantic import ValidationError, parse_obj_as
+
+from db import Education, Element, Experience, Language, Trivia, Volunteering
+
+if TYPE_CHECKING:
+    from storage import Storage
+
+logger = logging.getLogger(__name__)
+
+# Every section lives in its own file inside of the content directory, e.g. content/experiences.json
+SECTION_MODELS = {
+    "experiences": Experience,
+    "education": Education,
+    "volunteering": Volunteering,
+    "trivia": Trivia,
+}
+DATA_FILES = ("elements", *SECTION_MODELS)
+
+# The entries of these sections are written down in chronological order and reversed when loading them to
+# get reverse chronological order. Why not write them down in this order to begin with?
+# This is done to maintain future compatibility with a real database, where the natural order would
+# also be chronological, based on the later primary keys being larger
+REVERSED_SECTIONS = {"experiences"}
+
+
+class Content:
+    """
+    A complete, validated version of all content. It is never modified, a change to the data files
+    results in a new Content that replaces the old one as a whole.
+    """
+    __slots__ = ("elements", "sections", "version", "compressed")
+
+    def __init__(
+            self,
+            elements: dict[str, Element],
+            sections: dict[str, dict[Language, list]],
+            version: int,
+            compressed: Optional[dict[str, dict[str, bytes]]] = None,
+    ):
+        self.elements = elements
+        self.sections = sections
+        self.version = version
+        # Compressed payloads of this content from a snapshot (see snapshot.py), keyed by the digest of the body
+        self.compressed = compressed or {}
+
+    def replace(self, **changed) -> "Content":
+        """
+        Returns a new version of this content with some data files exchanged. The compressed payloads are not
+        taken over, the ones of unchanged files live on in the responses the next Site takes over.
+        """
+        elements = changed.pop("elements", self.elements)
+        return Content(elements, {**self.sections, **changed}, self.version + 1)
+
+
+def parse_elements(data) -> dict[str, Element]:
+    return {element.name: element for element in parse_obj_as(list[Element], data)}
+
+
+def parse_section(name: str, data) -> dict[Language, list]:
+    """Validates the entries of a section and splits them up by language"""
+    entries = parse_obj_as(list[SECTION_MODELS[name]], data)
+    if name in REVERSED_SECTIONS:
+        entries.reverse()
+    return {language: [entry for entry in entries if entry.language == language] for language in Language}
+
+
+def parse_data_file(name: str, data):
+    if name == "elements":
+        return parse_elements(data)
+    return parse_section(name, data)
+
+
+class ContentStore:
+    """
+    Loads the content from a storage (the JSON files of a directory or an SQLite database, see storage.py) the
+    first time it is needed and watches it for changes afterwards. Only the data files that changed are validated
+    again and the new content is swapped in with a single assignment, so readers either see the old or the new
+    version, never a mix. Requests only ever read the content in memory, the storage is read off the event loop.
+    """
+
+    def __init__(self, storage: "Storage", snapshot_path: Optional[str] = None):
+        self.storage = storage
+        self.snapshot_path = snapshot_path
+        self.listeners: list[Callable[[Content, set[str]], None]] = []
+        self._content: Optional[Content] = None
+        # Stamp and hash of every data file, the hash avoids rebuilding after a mere touch
+        self._stats: dict[str, Hashable] = {}
+        self._hashes: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def content(self) -> Content:
+        if self._content is None:
+            with self._lock:
+                if self._content is None:
+                    self._content = self.load()
+        return self._content
+
+    def read(self, name: str) -> tuple[Hashable, str, bytes]:
+        stamp, raw = self.storage.read(name)
+        return stamp, hashlib.sha256(raw).hexdigest(), raw
+
+    def load(self) -> Content:
+        raw_files = {}
+        for name in DATA_FILES:
+            self._stats[name], self._hashes[name], raw_files[name] = self.read(name)
+
+        if self.snapshot_path:
+            # Validating everything is only necessary if the snapshot was made from other data files
+            from snapshot import load_snapshot
+            content = load_snapshot(self.snapshot_path, raw_files)
+            if content is not None:
+                return content
+            logger.info("%s is missing or stale, validating the content", self.snapshot_path)
+
+        parsed = {name: parse_data_file(name, json.loads(raw)) for name, raw in raw_files.items()}
+        elements = parsed.pop("elements")
+        return Content(elements, parsed, version=1)
+
+    def subscribe(self, listener: Callable[[Content, set[str]], None]):
+        """Registers a function that is called with the new content and the names of the changed files"""
+        self.listeners.append(listener)
+
+    def changed_files(self) -> list[str]:
+        stamps = self.storage.stamps()
+        return [name for name in DATA_FILES if name in stamps and stamps[name] != self._stats.get(name)]
+
+    def reload(self) -> set[str]:
+        """Validates the data files that changed since the last check and swaps in the new content"""
+        content = self.content
+        with self._lock:
+            parsed = {}
+            for name in self.changed_files():
+                try:
+                    stats, digest, raw = self.read(name)
+                except OSError as error:
+                    logger.error("Keeping the previous version of %s: %s", self.storage.describe(name), error)
+                    continue
+                # Remembered even if the file is invalid, so that it is only checked again once it changed
+                self._stats[name] = stats
+                if digest == self._hashes.get(name):
+                    continue
+                try:
+                    parsed[name] = parse_data_file(name, json.loads(raw))
+                except (ValueError, ValidationError) as error:
+                    logger.error("Keeping the previous version of %s: %s", self.storage.describe(name), error)
+                    continue
+                self._hashes[name] = digest
+
+            if not parsed:
+                return set()
+            content = content.replace(**parsed)
+            self._content = content
+
+        changed = set(parsed)
+        logger.info("Reloaded %s, content is now at version %d", ", ".join(sorted(changed)), content.version)
+        for listener in self.listeners:
+            listener(content, changed)
+        return changed
+
+    async def watch(self, interval: float):
+        """Checks the storage for changes every interval seconds, the work happens off the event loop"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.reload)
+            except Exception:
+                logger.exception("Reloading the content failed")
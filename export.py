@@ -0,0 +1,102 @@
+import json
+import mimetypes
+import os
+import shutil
+
+from cache import CachedResponse
+from db import Language
+from images import FORMATS, URL_PREFIX, ImageVariants
+from render import DEFAULT_LANGUAGE
+from serviceworker import ServiceWorker, precache_static_files
+from static import SIBLING_EXTENSIONS, precompress_directory
+from website import BUNDLE_SECTIONS, Site
+
+MANIFEST_NAME = "export-manifest.json"
+
+
+def write_response(directory: str, path: str, response: CachedResponse) -> dict:
+    """Writes the body of a response and its compressed variants as .br/.gz siblings, like static.py does"""
+    target = os.path.join(directory, path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, "wb") as file:
+        file.write(response.body)
+    stat_result = os.stat(target)
+    encodings = []
+    for encoding, (body, _) in response.variants.items():
+        if encoding is None:
+            continue
+        sibling = target + SIBLING_EXTENSIONS[encoding]
+        with open(sibling, "wb") as file:
+            file.write(body)
+        os.utime(sibling, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+        encodings.append(encoding)
+    return {"file": path, "media_type": response.media_type, "etag": response.etag, "encodings": sorted(encodings)}
+
+
+def export_site(site: Site, public_directory: str, directory: str) -> dict:
+    """
+    Writes everything the app serves without a secret into directory: the static files, every API response as
+    a .json file, the prerendered page of each language and the image variants, all with precompressed siblings.
+    The manifest maps the URLs of the app to the files, so that any web server can serve them.
+    """
+    if os.path.isdir(directory) and os.listdir(directory):
+        if not os.path.exists(os.path.join(directory, MANIFEST_NAME)):
+            raise FileExistsError(f"{directory} is not empty and does not contain a previous export")
+        shutil.rmtree(directory)
+
+    def ignore(source: str, names: list[str]) -> list[str]:
+        # The rendered pages replace index.html, which is only the template for them
+        if os.path.samefile(source, public_directory):
+            return [name for name in names if name in ("index.html", "index.html.br", "index.html.gz")]
+        return []
+
+    shutil.copytree(public_directory, directory, ignore=ignore)
+    siblings = precompress_directory(directory)
+
+    routes: dict[str, dict] = {}
+    for root, _, names in os.walk(directory):
+        for name in sorted(names):
+            if os.path.splitext(name)[1] in SIBLING_EXTENSIONS.values():
+                continue
+            path = os.path.relpath(os.path.join(root, name), directory).replace(os.sep, "/")
+            routes["/" + path] = {
+                "file": path,
+                "media_type": mimetypes.guess_type(name)[0] or "text/plain",
+                "encodings": sorted(siblings.get(os.path.realpath(os.path.join(root, name)), {})),
+            }
+
+    for language in Language:
+        routes[f"/?language={language.value}"] = write_response(
+            directory, f"index.{language.value}.html", site.payloads["page", language],
+        )
+        for name in BUNDLE_SECTIONS + ("bundle",):
+            routes[f"/{name}/{language.value}"] = write_response(
+                directory, f"{name}/{language.value}.json", site.payloads[name, language],
+            )
+    routes["/"] = write_response(directory, "index.html", site.payloads["page", DEFAULT_LANGUAGE])
+
+    # Web servers can't pick the format by the Accept header on their own, so the JPEG is written under the URL
+    # of the variant and every other format next to it. The manifest lists them in order of preference.
+    image_variants: ImageVariants = site.image_variants
+    for key, files in image_variants.variants.items():
+        url = URL_PREFIX + key
+        formats = {}
+        for name in FORMATS:
+            if name not in files:
+                continue
+            path = url.lstrip("/") + ("" if name == "jpeg" else FORMATS[name]["extension"])
+            os.makedirs(os.path.dirname(os.path.join(directory, path)), exist_ok=True)
+            shutil.copy2(files[name], os.path.join(directory, path))
+            formats[FORMATS[name]["media_type"]] = path
+        routes[url] = {"file": formats["image/jpeg"], "media_type": "image/jpeg", "formats": formats}
+
+    # main.js registers the service worker of the page, which only precaches URLs the export serves
+    static_entries = [entry for entry in precache_static_files(public_directory) if entry["url"] in routes]
+    service_worker = ServiceWorker(site, static_entries)
+    routes["/service-worker.js"] = write_response(directory, "service-worker.js", service_worker.script)
+    routes["/precache-manifest.json"] = write_response(directory, "precache-manifest.json", service_worker.manifest)
+
+    manifest = {"routes": routes}
+    with open(os.path.join(directory, MANIFEST_NAME), "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+    return manifest
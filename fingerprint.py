@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import posixpath
+import re
+import sys
+
+MANIFEST_NAME = "asset-manifest.json"
+
+# Dependencies come first, so that the hash of a file covers the fingerprinted names it refers to
+ASSETS = ("dist/vue.esm-browser.js", "js/main.js", "css/output.css")
+
+# Documents that are served under their own name and only get their references rewritten
+DOCUMENTS = ("index.html",)
+
+REFERENCE_PATTERNS = {
+    ".html": re.compile(r'(?P<prefix>\b(?:href|src)=")(?P<url>[^"#?]+)(?P<suffix>")'),
+    ".js": re.compile(r'''(?P<prefix>\bimport\b[^'"]*?\bfrom\s*['"]|\bimport\s*\(?\s*['"])(?P<url>[^'"]+)(?P<suffix>['"])'''),
+    ".css": re.compile(r'''(?P<prefix>url\(\s*['"]?)(?P<url>[^'")]+)(?P<suffix>['"]?\s*\))'''),
+}
+
+
+def fingerprinted_name(path: str, content: bytes) -> str:
+    stem, extension = os.path.splitext(path)
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:10]}{extension}"
+
+
+def rewrite_references(content: str, url: str, extension: str, manifest: dict[str, str]) -> str:
+    """Points every reference to an asset that is in the manifest to its fingerprinted name"""
+    pattern = REFERENCE_PATTERNS.get(extension)
+    if pattern is None:
+        return content
+
+    def replace(match: re.Match) -> str:
+        reference = match.group("url")
+        if "://" in reference or reference.startswith(("data:", "//")):
+            return match.group(0)
+        resolved = posixpath.normpath(posixpath.join(posixpath.dirname(url), reference))
+        if resolved not in manifest:
+            return match.group(0)
+        return match.group("prefix") + manifest[resolved] + match.group("suffix")
+
+    return pattern.sub(replace, content)
+
+
+def fingerprint_directory(directory: str) -> dict[str, str]:
+    """
+    Writes a copy of every asset under a name that contains the hash of its content and rewrites the references
+    in the documents to them. The manifest maps the original URLs to the fingerprinted ones.
+    Meant for the Docker build, as it changes index.html in place.
+    """
+    manifest: dict[str, str] = {}
+    for asset in ASSETS:
+        path = os.path.join(directory, asset)
+        url = "/" + asset
+        with open(path, encoding="utf-8") as file:
+            content = rewrite_references(file.read(), url, os.path.splitext(asset)[1], manifest).encode("utf-8")
+
+        fingerprinted = fingerprinted_name(asset, content)
+        with open(os.path.join(directory, fingerprinted), "wb") as file:
+            file.write(content)
+        manifest[url] = "/" + fingerprinted
+
+        # Copies of previous versions of the asset are of no use anymore
+        stem, extension = os.path.splitext(os.path.basename(asset))
+        previous_pattern = re.compile(re.escape(stem) + r"\.[0-9a-f]{10}" + re.escape(extension) + "$")
+        for name in os.listdir(os.path.dirname(path)):
+            if previous_pattern.match(name) and name != os.path.basename(fingerprinted):
+                os.remove(os.path.join(os.path.dirname(path), name))
+
+    for document in DOCUMENTS:
+        path = os.path.join(directory, document)
+        with open(path, encoding="utf-8") as file:
+            content = rewrite_references(file.read(), "/" + document, os.path.splitext(document)[1], manifest)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+
+    with open(os.path.join(directory, MANIFEST_NAME), "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+    return manifest
+
+
+def load_manifest(directory: str) -> dict[str, str]:
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+if __name__ == "__main__":
+    for original, fingerprinted in fingerprint_directory(sys.argv[1] if len(sys.argv) > 1 else "public").items():
+        print(original, "->", fingerprinted)
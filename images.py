@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import re
+import sys
+from functools import lru_cache
+from typing import Optional
+
+try:
+    from PIL import Image, features
+except ImportError:  # Pillow is only needed to build the variants, serving them works without it
+    Image = None
+
+SOURCE_EXTENSIONS = {".jpeg", ".jpg", ".png"}
+DERIVED_DIRECTORY = "derived"
+MANIFEST_NAME = "manifest.json"
+WIDTHS = (160, 320, 480, 640, 960, 1280, 1920)
+
+# Ordered by preference, of the formats the client accepts equally the first one is served
+FORMATS = {
+    "avif": {"media_type": "image/avif", "extension": ".avif", "options": {"quality": 50}},
+    "webp": {"media_type": "image/webp", "extension": ".webp", "options": {"quality": 75, "method": 6}},
+    "jpeg": {"media_type": "image/jpeg", "extension": ".jpeg", "options": {"quality": 80, "progressive": True, "optimize": True}},
+}
+
+URL_PREFIX = "/images/responsive/"
+
+
+@lru_cache(maxsize=128)
+def parse_accept(accept: str) -> tuple[tuple[str, float], ...]:
+    """The media ranges of an Accept header with their q-values, an empty header accepts everything"""
+    ranges = []
+    for part in accept.split(","):
+        media_range, *parameters = part.strip().split(";")
+        media_range = media_range.strip().lower()
+        if "/" not in media_range:
+            continue
+        quality = 1.0
+        for parameter in parameters:
+            name, _, value = parameter.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    quality = 0.0
+        ranges.append((media_range, quality))
+    return tuple(ranges) if ranges else (("*/*", 1.0),)
+
+
+def media_type_quality(media_type: str, ranges: tuple[tuple[str, float], ...], wildcards: bool = True) -> float:
+    """The q-value of the most specific range that matches media_type (image/avif over image/* over */*)"""
+    main_type = media_type.split("/")[0]
+    best_specificity, best_quality = -1, 0.0
+    for media_range, quality in ranges:
+        if media_range == media_type:
+            specificity = 2
+        elif wildcards and media_range == f"{main_type}/*":
+            specificity = 1
+        elif wildcards and media_range == "*/*":
+            specificity = 0
+        else:
+            continue
+        if specificity > best_specificity:
+            best_specificity, best_quality = specificity, quality
+    return best_quality
+
+
+def file_hash(path: str) -> str:
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()[:12]
+
+
+def supported_formats() -> list[str]:
+    return [name for name in FORMATS if name == "jpeg" or features.check(name)]
+
+
+def variant_widths(source_width: int) -> list[int]:
+    """All widths smaller than the source, plus the source width itself if it is not larger than the biggest width"""
+    widths = [width for width in WIDTHS if width < source_width]
+    if source_width <= WIDTHS[-1]:
+        widths.append(source_width)
+    return widths
+
+
+def derive_image(path: str, derived_directory: str, formats: list[str]) -> dict:
+    """Writes all variants of one image unless they already exist for its current content"""
+    source_hash = file_hash(path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    with Image.open(path) as source:
+        source = source.convert("RGB")
+        entry = {"hash": source_hash, "width": source.width, "variants": {}}
+        for width in variant_widths(source.width):
+            key = f"{stem}-{source_hash}-{width}w"
+            resized = None
+            files = {}
+            for name in formats:
+                filename = key + FORMATS[name]["extension"]
+                target = os.path.join(derived_directory, filename)
+                if not os.path.exists(target):
+                    if resized is None:
+                        height = round(source.height * width / source.width)
+                        resized = source.resize((width, height), Image.LANCZOS)
+                    resized.save(target, format=name.upper(), **FORMATS[name]["options"])
+                files[name] = filename
+            entry["variants"][key] = {"width": width, "files": files}
+    return entry
+
+
+def derive_directory(directory: str) -> dict:
+    """
+    Derives the variants of every image in directory and writes the manifest describing them. Variants are
+    keyed by the hash of their source, so unchanged images are skipped and outdated variants are removed.
+    """
+    derived_directory = os.path.join(directory, DERIVED_DIRECTORY)
+    os.makedirs(derived_directory, exist_ok=True)
+    formats = supported_formats()
+
+    manifest = {}
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path) and os.path.splitext(name)[1].lower() in SOURCE_EXTENSIONS:
+            manifest[name] = derive_image(path, derived_directory, formats)
+
+    current = {filename for entry in manifest.values() for variant in entry["variants"].values()
+               for filename in variant["files"].values()}
+    for filename in os.listdir(derived_directory):
+        if filename != MANIFEST_NAME and filename not in current:
+            os.remove(os.path.join(derived_directory, filename))
+
+    with open(os.path.join(derived_directory, MANIFEST_NAME), "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+    return manifest
+
+
+class ImageVariants:
+    """The variants described by the manifest of a derived directory, loaded once when the app starts"""
+
+    def __init__(self, directory: str, url_path: str = "/images/"):
+        self.directory = os.path.join(directory, DERIVED_DIRECTORY)
+        self.url_path = url_path
+        try:
+            with open(os.path.join(self.directory, MANIFEST_NAME), encoding="utf-8") as file:
+                self.manifest: dict = json.load(file)
+        except FileNotFoundError:
+            self.manifest = {}
+
+        # Only variants that are actually on disk are offered, nothing is ever generated while serving
+        self.variants: dict[str, dict[str, str]] = {}
+        for entry in self.manifest.values():
+            for key, variant in entry["variants"].items():
+                files = {name: os.path.join(self.directory, filename) for name, filename in variant["files"].items()}
+                files = {name: path for name, path in files.items() if os.path.isfile(path)}
+                if "jpeg" in files:
+                    self.variants[key] = files
+
+    def srcset(self, name: str) -> Optional[str]:
+        entry = self.manifest.get(name)
+        if entry is None:
+            return None
+        candidates = [f"{URL_PREFIX}{key} {variant['width']}w" for key, variant in entry["variants"].items()
+                      if key in self.variants]
+        return ", ".join(candidates) or None
+
+    def add_srcsets(self, html: str) -> str:
+        """Adds a srcset to every <img> whose src points at an image with derived variants"""
+        def replace(match: re.Match) -> str:
+            srcset = self.srcset(match.group(2))
+            if srcset is None or "srcset=" in match.group(0):
+                return match.group(0)
+            return f'{match.group(1)} srcset="{srcset}"{match.group(3)}'
+
+        pattern = re.compile(r'(<img\b[^>]*?\bsrc="' + re.escape(self.url_path) + r'([^"/]+)")([^>]*>)')
+        return pattern.sub(replace, html)
+
+    def best_file(self, key: str, accept: str) -> Optional[tuple[str, str]]:
+        """
+        Returns the path and media type of the variant the client prefers according to Accept, the smaller
+        format wins a tie. Browsers send image/* and */* whether they can decode AVIF and WebP or not, so those
+        only count if they are named, JPEG is the fallback if the client accepts none of the variants.
+        """
+        files = self.variants.get(key)
+        if files is None:
+            return None
+        ranges = parse_accept(accept)
+        candidates = [
+            (-media_type_quality(options["media_type"], ranges, wildcards=name == "jpeg"), position, name)
+            for position, (name, options) in enumerate(FORMATS.items()) if name in files
+        ]
+        if not candidates:
+            return None
+        quality, _, name = min(candidates)
+        if quality == 0:
+            if "jpeg" not in files:
+                return None
+            name = "jpeg"
+        return files[name], FORMATS[name]["media_type"]
+
+
+if __name__ == "__main__":
+    if Image is None:
+        sys.exit("Pillow needs to be installed to derive image variants")
+    for image, description in derive_directory(sys.argv[1] if len(sys.argv) > 1 else "public/images").items():
+        print(image, ", ".join(description["variants"]))
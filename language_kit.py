@@ -0,0 +1,33 @@
+from types import MappingProxyType
+
+from cache import CachedResponse, LRUCache, dump_json
+from db import Element, Language
+
+
+class LanguageKit:
+    """
+    The translated content of every element for one language. The kit is immutable once built, and each
+    element is serialized on its own, so that any selection of elements can be answered by joining
+    the already serialized members instead of encoding them again.
+    """
+
+    def __init__(self, language: Language, element_db: dict[str, Element]):
+        self.language = language
+        self.elements = MappingProxyType({key: value.content[language] for key, value in element_db.items()})
+        # '{"key":"value"}' without the braces is the member we need to stitch objects together
+        self.members = MappingProxyType({key: dump_json({key: value})[1:-1] for key, value in self.elements.items()})
+        self.response = self.build_response(tuple(self.members))
+        self.projections = LRUCache(maxsize=256)
+
+    def build_response(self, keys: tuple[str, ...]) -> CachedResponse:
+        return CachedResponse(b"{" + b",".join(self.members[key] for key in keys) + b"}")
+
+    def unknown_keys(self, keys) -> set[str]:
+        return set(keys).difference(self.members)
+
+    def project(self, keys) -> CachedResponse:
+        """Returns the response containing only the specified elements, in the order of the kit"""
+        selected = tuple(key for key in self.members if key in keys)
+        if len(selected) == len(self.members):
+            return self.response
+        return self.projections.get_or_build(selected, lambda: self.build_response(selected))
@@ -1,88 +1,382 @@
+import asyncio
+import hmac
+import math
 import os
+from datetime import date
+from typing import Optional
 
-from fastapi import FastAPI, HTTPException, status
-from fastapi.staticfiles import StaticFiles
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse, HTMLResponse, PlainTextResponse, Response
 
-from db import Language, PersonalData
-from db import education_db_de, education_db_en
-from db import element_db
-from db import experience_db_de, experience_db_en
-from db import trivia_db_de, trivia_db_en
-from db import volunteering_db_de, volunteering_db_en
+from cache import FastJSONResponse
+from content import ContentStore
+from db import Education, Experience, Language, PersonalData, Trivia, Volunteering
+from images import ImageVariants
+from metrics import Metrics, MetricsMiddleware
+from personal_data import load_personal_data, secret_matches
+from preload import PreloadMiddleware, find_preloads
+from ratelimit import TokenBucketLimiter
+from render import DEFAULT_LANGUAGE, LANGUAGE_COOKIE, negotiate_language
+from serviceworker import precache_static_files
+from static import PrecompressedStaticFiles
+from storage import open_storage
+from tenants import Tenant, TenantMiddleware, TenantRegistry
+from timeline import parse_query_date
+from website import BUNDLE_SECTIONS, load_index_template
 
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 
+metrics = Metrics()
+app.add_middleware(MetricsMiddleware, metrics=metrics)
 
-@app.get("/elements/{language}")
-async def get_element(language: Language):
-    """Builds a language-kit for the specified language"""
-    language_kit: dict[str, str] = {}
-    for key, value in element_db.items():
-        language_kit[key] = value.content[language]
+index_template = load_index_template()
 
-    return language_kit
+# Built beforehand by running `python -m images public/images`, pages simply go without srcset if it wasn't
+image_variants = ImageVariants("public/images")
 
+# The stylesheet, the modules (including the Vue import of main.js) and the profile picture are announced with the
+# response of the page, so the browser does not have to discover them one after another
+app.add_middleware(PreloadMiddleware, links=find_preloads("public", image_variants))
 
-@app.get("/experiences/{language}")
-async def get_experience(language: Language):
+# The content lives in the JSON files of the content directory or, with CV_CONTENT_STORAGE=sqlite:<path>, in an
+# SQLite database filled by `python -m storage import`. Changes are picked up without a restart.
+# Startup is a lot faster with a snapshot written by `python -m snapshot`, an empty path disables it.
+content_directory = os.environ.get("CV_CONTENT_DIRECTORY", "content")
+content_store = ContentStore(
+    open_storage(os.environ.get("CV_CONTENT_STORAGE", content_directory)),
+    snapshot_path=os.environ.get("CV_CONTENT_SNAPSHOT", os.path.join(content_directory, "snapshot.marshal")),
+)
+
+# The precache manifest lists the files the page refers to and the pages and bundles of the current content
+precached_static_files = precache_static_files("public")
+
+# Printable documents are rendered on first request and kept on disk, so that restarts don't render them again
+print_directory = os.environ.get("CV_PRINT_CACHE_DIRECTORY", "cache/print")
+
+# The CV of the content directory, its personal data is validated and serialized only once
+default_tenant = Tenant(
+    "default",
+    content_store,
+    index_template=index_template,
+    image_variants=image_variants,
+    precached_static_files=precached_static_files,
+    personal_data=load_personal_data(),
+    personal_data_secret=os.environ.get("CV_PERSONAL_DATA_SECRET"),
+    print_directory=print_directory,
+)
+
+# Further CVs are served from the subdirectories of the tenants directory, selected by their host names or a
+# /t/<name>/ prefix. They are loaded on first request and dropped again once they take up too much memory.
+tenant_registry = TenantRegistry(
+    os.environ.get("CV_TENANTS_DIRECTORY", "tenants"),
+    default_tenant,
+    max_bytes=int(os.environ.get("CV_TENANTS_CACHE_BYTES", 256 * 1024 * 1024)),
+    index_template=index_template,
+    image_variants=image_variants,
+    precached_static_files=precached_static_files,
+    print_directory=print_directory,
+)
+app.add_middleware(TenantMiddleware, registry=tenant_registry)
+
+# A visitor needs one request per page load, anything beyond a burst of ten is most likely guessing the secret.
+# The limit is shared by all tenants, so that guessing can't be spread over them. Every worker of serve.py keeps
+# its own buckets, so each one only allows its share of the limit (CV_WORKERS is set by serve.py).
+workers = int(os.environ.get("CV_WORKERS", "1"))
+personal_data_limiter = TokenBucketLimiter(capacity=max(1.0, 10 / workers), refill_rate=1 / 6 / workers)
+
+
+def current_tenant(request: Request) -> Tenant:
+    """The tenant TenantMiddleware selected for the request"""
+    return request.scope.get("tenant", default_tenant)
+
+
+@app.on_event("startup")
+async def watch_content():
+    interval = float(os.environ.get("CV_CONTENT_RELOAD_INTERVAL", "2"))
+    if interval > 0:
+        app.state.content_watchers = [
+            asyncio.create_task(content_store.watch(interval)),
+            asyncio.create_task(tenant_registry.watch(interval)),
+        ]
+
+
+@app.on_event("shutdown")
+async def stop_watching_content():
+    for watcher in getattr(app.state, "content_watchers", []):
+        watcher.cancel()
+
+
+@app.on_event("shutdown")
+def close_content_storage():
+    content_store.storage.close()
+
+
+@app.api_route("/", methods=["GET", "HEAD"], response_class=HTMLResponse)
+async def get_index(request: Request, language: Optional[str] = None, tenant: Tenant = Depends(current_tenant)):
+    """
+    Returns index.html with the CV already rendered for the specified language. Without one (or with one that
+    isn't available), the language is taken from the cookie main.js sets when switching it, then from
+    Accept-Language. HEAD describes the same rendered page, not the template the static files would serve.
+    """
+    site = tenant.site
+    if language in Language.__members__:
+        selected = Language(language)
+        response = site.payloads["page", selected].respond(request)
+    else:
+        cookie = request.cookies.get(LANGUAGE_COOKIE)
+        selected = (
+            Language(cookie) if cookie in Language.__members__
+            else negotiate_language(request.headers.get("accept-language", "")) or DEFAULT_LANGUAGE
+        )
+        response = site.payloads["page", selected].respond(request)
+        # The same URL is a different page depending on these headers, caches must not mix them up
+        response.headers["Vary"] = "Accept-Encoding, Accept-Language, Cookie"
+    response.headers["Content-Language"] = selected.value
+    return response
+
+
+@app.get("/print/{language}", response_class=HTMLResponse)
+async def get_printable(
+        language: Language,
+        request: Request,
+        download: bool = False,
+        tenant: Tenant = Depends(current_tenant),
+):
+    """Returns a self-contained, print-optimized HTML document of the CV, as an attachment if asked to"""
+    response = (await tenant.print_cache.get(tenant.site, language)).respond(request)
+    if download:
+        response.headers["Content-Disposition"] = f'attachment; filename="cv-{language.value}.html"'
+    return response
+
+
+@app.get("/service-worker.js", include_in_schema=False)
+async def get_service_worker(request: Request, tenant: Tenant = Depends(current_tenant)):
+    """Returns the service worker, it changes whenever an entry of the precache manifest does"""
+    return tenant.service_worker.script.respond(request)
+
+
+@app.get("/precache-manifest.json", include_in_schema=False)
+async def get_precache_manifest(request: Request, tenant: Tenant = Depends(current_tenant)):
+    """Returns the URLs the service worker caches up front, each with the hash of its content as revision"""
+    return tenant.service_worker.manifest.respond(request)
+
+
+@app.get("/elements/{language}", response_model=dict[str, str])
+async def get_element(
+        language: Language,
+        request: Request,
+        keys: Optional[str] = None,
+        tenant: Tenant = Depends(current_tenant),
+):
+    """
+    Returns the pre-built language-kit for the specified language, optionally restricted to a
+    comma-separated list of element keys
+    """
+    language_kit = tenant.site.language_kits[language]
+    if keys is None:
+        return language_kit.response.respond(request)
+
+    requested = {key.strip() for key in keys.split(",") if key.strip()}
+    unknown = language_kit.unknown_keys(requested)
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown element keys: {', '.join(sorted(unknown))}" if unknown else "keys must not be empty",
+        )
+    return language_kit.project(requested).respond(request)
+
+
+def section_response(
+        tenant: Tenant,
+        section: str,
+        language: Language,
+        request: Request,
+        fields: Optional[str],
+        highlight: bool,
+):
+    """Returns the pre-sorted entries of a section, optionally only the highlighted ones or only some fields"""
+    index = tenant.site.sections[section, language]
+    requested = None
+    if fields is not None:
+        requested = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = index.unknown_fields(requested)
+        if unknown or not requested:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"fields must be a comma-separated list of {', '.join(index.fields)}",
+            )
+    return index.select(requested, highlight).respond(request)
+
+
+@app.get("/experiences/{language}", response_model=list[Experience])
+async def get_experience(
+        language: Language,
+        request: Request,
+        fields: Optional[str] = None,
+        highlight: bool = False,
+        tenant: Tenant = Depends(current_tenant),
+):
     """Returns the pre-sorted entries of the corresponding list"""
-    if language == Language.en:
-        return experience_db_en
-    elif language == Language.de:
-        return experience_db_de
+    return section_response(tenant, "experiences", language, request, fields, highlight)
 
 
-@app.get("/education/{language}")
-async def get_education(language: Language):
+@app.get("/education/{language}", response_model=list[Education])
+async def get_education(
+        language: Language,
+        request: Request,
+        fields: Optional[str] = None,
+        tenant: Tenant = Depends(current_tenant),
+):
     """Returns the pre-sorted entries of the corresponding list"""
-    if language == Language.en:
-        return education_db_en
-    elif language == Language.de:
-        return education_db_de
+    return section_response(tenant, "education", language, request, fields, highlight=False)
 
 
-@app.get("/volunteering/{language}")
-async def get_education(language: Language):
+@app.get("/volunteering/{language}", response_model=list[Volunteering])
+async def get_volunteering(
+        language: Language,
+        request: Request,
+        fields: Optional[str] = None,
+        highlight: bool = False,
+        tenant: Tenant = Depends(current_tenant),
+):
     """Returns the pre-sorted entries of the corresponding list"""
-    if language == Language.en:
-        return volunteering_db_en
-    elif language == Language.de:
-        return volunteering_db_de
+    return section_response(tenant, "volunteering", language, request, fields, highlight)
 
 
-@app.get("/trivia/{language}")
-async def get_trivia(language: Language):
+@app.get("/trivia/{language}", response_model=list[Trivia])
+async def get_trivia(
+        language: Language,
+        request: Request,
+        fields: Optional[str] = None,
+        highlight: bool = False,
+        tenant: Tenant = Depends(current_tenant),
+):
     """Returns the pre-sorted entries of the corresponding list"""
-    if language == Language.en:
-        return trivia_db_en
-    elif language == Language.de:
-        return trivia_db_de
+    return section_response(tenant, "trivia", language, request, fields, highlight)
+
+
+@app.get("/bundle/{language}")
+async def get_bundle(
+        language: Language,
+        request: Request,
+        section_filter: Optional[str] = Query(None, alias="sections"),
+        tenant: Tenant = Depends(current_tenant),
+):
+    """
+    Returns all sections for the specified language in one response, optionally restricted to a
+    comma-separated list of sections
+    """
+    if section_filter is None:
+        return tenant.site.payloads["bundle", language].respond(request)
+
+    requested = {section.strip() for section in section_filter.split(",") if section.strip()}
+    unknown = requested.difference(BUNDLE_SECTIONS)
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"sections must be a comma-separated list of {', '.join(BUNDLE_SECTIONS)}",
+        )
+
+    selected = tuple(section for section in BUNDLE_SECTIONS if section in requested)
+    return tenant.site.filtered_bundle(language, selected).respond(request)
+
+
+@app.get("/search/{language}")
+async def search(
+        language: Language,
+        q: str = Query(..., min_length=1, max_length=200),
+        limit: int = Query(10, ge=1, le=50),
+        tenant: Tenant = Depends(current_tenant),
+):
+    """
+    Returns the entries of all sections and the elements that contain every word of the query, best match first.
+    The last word is matched as a prefix, so that results can be shown while typing.
+    """
+    return Response(tenant.site.search_indexes[language].search(q, limit), media_type="application/json")
 
 
-@app.get("/personal_data")
-async def get_personal_data(secret: str):
+@app.get("/timeline/{language}")
+async def get_timeline(
+        language: Language,
+        start: Optional[str] = Query(None, alias="from"),
+        end: Optional[str] = Query(None, alias="to"),
+        tenant: Tenant = Depends(current_tenant),
+):
+    """
+    Returns the experiences, education and volunteering that overlap the range between from and to (YYYY,
+    YYYY-MM or YYYY-MM-DD, both optional) in one list, oldest first
+    """
+    try:
+        start_date = parse_query_date(start) if start else date.min
+        end_date = parse_query_date(end, end=True) if end else date.max
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(error))
+    if end_date < start_date:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="from must not be after to")
+    return Response(tenant.site.timelines[language].between(start_date, end_date), media_type="application/json")
+
+
+@app.get("/images/responsive/{variant}", response_class=FileResponse)
+async def get_image_variant(variant: str, request: Request):
+    """Returns the best format of a derived image variant the client accepts"""
+    best_file = image_variants.best_file(variant, request.headers.get("accept", ""))
+    if best_file is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    path, media_type = best_file
+    # The variant name contains the hash of its source image, so it can be cached forever
+    return FileResponse(path, media_type=media_type, headers={
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "Vary": "Accept",
+    })
+
+
+@app.get("/internal/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics(request: Request):
+    """
+    Returns the request metrics in the Prometheus text format to whoever supplies CV_METRICS_TOKEN as a
+    bearer token. Without a token configured the endpoint doesn't exist, the metrics are not meant for visitors.
+    """
+    token = os.environ.get("CV_METRICS_TOKEN")
+    if not token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if not hmac.compare_digest(request.headers.get("authorization", ""), f"Bearer {token}"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/personal_data", response_model=PersonalData)
+async def get_personal_data(secret: str, request: Request, tenant: Tenant = Depends(current_tenant)):
     """
     Returns personal data from environment variables, so that this sensitive data does not need
     to be stored inside of git
     """
-    if secret is not None and secret.lower() == os.environ.get("CV_PERSONAL_DATA_SECRET"):
-        personal_data = PersonalData(
-            name=os.environ.get("CV_NAME"),
-            telephone=os.environ.get("CV_TELEPHONE"),
-            email=os.environ.get("CV_EMAIL"),
-            address_street=os.environ.get("CV_ADDRESS_STREET"),
-            address_zip=os.environ.get("CV_ADDRESS_ZIP"),
-            address_city=os.environ.get("CV_ADDRESS_CITY"),
-            nationality=os.environ.get("CV_NATIONALITY"),
-            date_of_birth=os.environ.get("CV_DATE_OF_BIRTH"),
+    wait = personal_data_limiter.acquire(request.client.host if request.client else "")
+    if wait:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts to access the personal data on this CV, please try again later.",
+            headers={"Retry-After": str(math.ceil(wait))},
         )
-        return personal_data
-    else:
-        return HTTPException(
+
+    if tenant.personal_data_response is None or not secret_matches(secret, tenant.personal_data_secret):
+        raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="You did not supply the secret needed to access the personal data on this CV.",
         )
+    return tenant.personal_data_response.respond(request)
 
 
 # If none of the API routes match, serve the static content that makes up out Vue app
-app.mount('/', StaticFiles(directory='public', html=True))
+app.mount('/', PrecompressedStaticFiles(directory='public', html=True))
+
+
+if __name__ == "__main__":
+    import sys
+
+    from export import export_site
+
+    if len(sys.argv) != 3 or sys.argv[1] != "export":
+        sys.exit("Usage: python -m main export <directory>")
+    routes = export_site(default_tenant.site, "public", sys.argv[2])["routes"]
+    print(f"Exported {len(routes)} routes to {sys.argv[2]}")
@@ -0,0 +1,142 @@
+import time
+from bisect import bisect_left
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from db import Language
+
+# Upper bounds of the histogram buckets, the last bucket (+Inf) is implicit
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class Series:
+    """All numbers recorded for one combination of labels, the buckets are allocated once up front"""
+    __slots__ = ("count", "latency_sum", "latency_buckets", "size_sum", "size_buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.size_sum = 0
+        self.size_buckets = [0] * (len(SIZE_BUCKETS) + 1)
+
+
+def format_labels(labels: dict[str, str]) -> str:
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return ",".join(f'{name}="{escape(value)}"' for name, value in labels.items())
+
+
+def format_histogram(lines: list[str], name: str, labels: str, bounds, buckets: list[int], total, count: int):
+    cumulative = 0
+    for bound, bucket in zip(bounds, buckets):
+        cumulative += bucket
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {count}')
+    lines.append(f"{name}_sum{{{labels}}} {total}")
+    lines.append(f"{name}_count{{{labels}}} {count}")
+
+
+class Metrics:
+    """
+    Request counts, status codes, response sizes and latencies per route and language. Every worker of serve.py
+    counts on its own, worker labels its series so that they stay apart when scraped through a load balancer.
+    """
+
+    def __init__(self, worker: str = ""):
+        self.worker = worker
+        self.series: dict[tuple[str, str, str, int], Series] = {}
+
+    def record(self, method: str, route: str, language: str, status: int, latency: float, size: int):
+        key = (method, route, language, status)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = Series()
+        series.count += 1
+        series.latency_sum += latency
+        series.latency_buckets[bisect_left(LATENCY_BUCKETS, latency)] += 1
+        series.size_sum += size
+        series.size_buckets[bisect_left(SIZE_BUCKETS, size)] += 1
+
+    def render(self) -> str:
+        """Returns all metrics in the Prometheus text exposition format"""
+        requests = [
+            "# HELP cv_http_requests_total Number of handled requests.",
+            "# TYPE cv_http_requests_total counter",
+        ]
+        latencies = [
+            "# HELP cv_http_request_duration_seconds Time from receiving a request until its response was sent.",
+            "# TYPE cv_http_request_duration_seconds histogram",
+        ]
+        sizes = [
+            "# HELP cv_http_response_size_bytes Size of the response bodies as sent, after compression.",
+            "# TYPE cv_http_response_size_bytes histogram",
+        ]
+        worker = {"worker": self.worker} if self.worker else {}
+        for (method, route, language, status), series in sorted(self.series.items()):
+            labels = format_labels(
+                {**worker, "method": method, "route": route, "language": language, "status": str(status)}
+            )
+            requests.append(f"cv_http_requests_total{{{labels}}} {series.count}")
+            format_histogram(latencies, "cv_http_request_duration_seconds", labels, LATENCY_BUCKETS,
+                             series.latency_buckets, series.latency_sum, series.count)
+            format_histogram(sizes, "cv_http_response_size_bytes", labels, SIZE_BUCKETS,
+                             series.size_buckets, series.size_sum, series.count)
+        return "\n".join(requests + latencies + sizes) + "\n"
+
+
+# Anything else in the language path parameter or the method is counted as other, so that clients can't create
+# endless series
+LANGUAGE_LABELS = {language.value: language.value for language in Language}
+METHOD_LABELS = {method: method for method in ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS")}
+
+
+def route_label(scope: Scope) -> str:
+    """The path template of the API route that handled the request, or static for everything the mount served"""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if "endpoint" in scope:
+        return "static"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Records every request in metrics, covering both the API routes and the static files"""
+
+    def __init__(self, app: ASGIApp, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_and_record(message: Message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            # The router adds the route and the path parameters to the scope while handling the request
+            language = scope.get("path_params", {}).get("language")
+            self.metrics.record(
+                METHOD_LABELS.get(scope["method"], "other"),
+                route_label(scope),
+                "" if language is None else LANGUAGE_LABELS.get(language, "other"),
+                status,
+                time.perf_counter() - started,
+                size,
+            )
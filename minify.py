@@ -0,0 +1,267 @@
+import os
+import re
+import sys
+from typing import Optional
+
+from preload import TAG_PATTERNS, attribute, resolve
+from storage import Storage, open_storage
+
+DOCUMENT = "index.html"
+SCRIPTS = ("js/main.js",)
+
+# The page is a single column that starts with the header and the glance copy, so nearly every element of the
+# template is on the first screen of a large display. Instead of guessing a fold, every rule that can match
+# the elements of the template (and the HTML in the content, which is rendered with v-html) is critical.
+CLASS_PATTERN = re.compile(r"\.((?:\\[0-9a-fA-F]{1,6} ?|\\.|[\w-])+)")
+ID_PATTERN = re.compile(r"#((?:\\.|[\w-])+)")
+ATTRIBUTE_SELECTOR_PATTERN = re.compile(r"\[[^\]]*\]")
+PSEUDO_PATTERN = re.compile(r"::?[\w-]+(?:\([^()]*\))?")
+TAG_SELECTOR_PATTERN = re.compile(r"(?<![\w-])([a-zA-Z][\w-]*)")
+
+TAG_NAME_PATTERN = re.compile(r"<([a-zA-Z][\w-]*)")
+CLASS_ATTRIBUTE_PATTERN = re.compile(r'(?<![\w:@-])class="([^"]*)"')
+CLASS_BINDING_PATTERN = re.compile(r':class="([^"]*)"')
+ID_ATTRIBUTE_PATTERN = re.compile(r'(?<![\w:@-])id="([^"]*)"')
+
+# Elements around which whitespace never shows, everything else is inline and keeps a single space
+BLOCK_TAG_PATTERN = re.compile(
+    r"\s*(</?(?:html|head|body|meta|link|title|script|style|noscript|template|div|p|h[1-6]|ul|ol|li|br)\b[^>]*>)\s*",
+    re.IGNORECASE,
+)
+# Their content is kept as it is
+RAW_ELEMENT_PATTERN = re.compile(r"(<(script|style|pre|textarea)\b[^>]*>)(.*?)(</\2>)", re.IGNORECASE | re.DOTALL)
+HTML_COMMENT_PATTERN = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+
+JS_TOKEN_PATTERN = re.compile(
+    r"""(?P<comment>//[^\n]*|/\*.*?\*/)"""
+    r"""|(?P<string>'(?:\\.|[^'\\\n])*'|"(?:\\.|[^"\\\n])*"|`(?:\\.|[^`\\])*`)"""
+    r"""|(?P<regex>(?<=[(,=:\[!&|?{};])\s*/(?![/*])(?:\\.|\[(?:\\.|[^\]\\])*\]|[^/\\\n])+/[a-z]*)"""
+    r"""|(?P<space>\s+)"""
+    r"""|(?P<code>[^\s'"`/]+|/)""",
+    re.DOTALL,
+)
+IDENTIFIER_CHARACTERS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$")
+# A line break after or before these never ends a statement, anywhere else it might (automatic semicolons)
+CONTINUES_AFTER = frozenset("{([,;:=&|?*<>!")
+CONTINUES_BEFORE = frozenset(")]},;.:?=&|")
+
+
+def split_rules(css: str) -> list[tuple[str, Optional[str]]]:
+    """Splits a stylesheet into its top-level rules as (prelude, block), statements like @charset have no block"""
+    rules: list[tuple[str, Optional[str]]] = []
+    depth = 0
+    start = block_start = 0
+    prelude = ""
+    quote = None
+    position = 0
+    while position < len(css):
+        character = css[position]
+        if quote is not None:
+            if character == "\\":
+                position += 1
+            elif character == quote:
+                quote = None
+        elif character in "\"'":
+            quote = character
+        elif css.startswith("/*", position):
+            end = css.find("*/", position + 2)
+            position = len(css) if end == -1 else end + 2
+            if depth == 0:
+                start = position
+            continue
+        elif character == "{":
+            if depth == 0:
+                prelude = css[start:position].strip()
+                block_start = position + 1
+            depth += 1
+        elif character == "}":
+            depth -= 1
+            if depth == 0:
+                rules.append((prelude, css[block_start:position]))
+                start = position + 1
+        elif character == ";" and depth == 0:
+            rules.append((css[start:position].strip(), None))
+            start = position + 1
+        position += 1
+    return rules
+
+
+def split_selectors(prelude: str) -> list[str]:
+    selectors = []
+    depth = 0
+    start = 0
+    for position, character in enumerate(prelude):
+        if character in "([":
+            depth += 1
+        elif character in ")]":
+            depth -= 1
+        elif character == "," and depth == 0:
+            selectors.append(prelude[start:position])
+            start = position + 1
+    selectors.append(prelude[start:])
+    return selectors
+
+
+def unescape(name: str) -> str:
+    name = re.sub(r"\\([0-9a-fA-F]{1,6}) ?", lambda match: chr(int(match.group(1), 16)), name)
+    return re.sub(r"\\(.)", r"\1", name)
+
+
+def remove_negations(selector: str) -> str:
+    """Drops every :not(…), what it rules out doesn't have to be in the document"""
+    while (start := selector.find(":not(")) != -1:
+        depth = 0
+        for end in range(start + 4, len(selector)):
+            depth += {"(": 1, ")": -1}.get(selector[end], 0)
+            if depth == 0:
+                break
+        selector = selector[:start] + selector[end + 1:]
+    return selector
+
+
+def selector_matches(selector: str, vocabulary: dict[str, set[str]]) -> bool:
+    """Whether every class, id and tag the selector needs appears in the document, attributes are not checked"""
+    selector = remove_negations(selector)
+    classes = {unescape(name) for name in CLASS_PATTERN.findall(selector)}
+    ids = {unescape(name) for name in ID_PATTERN.findall(selector)}
+    rest = ATTRIBUTE_SELECTOR_PATTERN.sub(" ", ID_PATTERN.sub(" ", CLASS_PATTERN.sub(" ", selector)))
+    rest = re.sub(r"::?(?:where|is)\(", " ", rest)
+    rest = PSEUDO_PATTERN.sub(" ", rest).replace(")", " ")
+    tags = {tag.lower() for tag in TAG_SELECTOR_PATTERN.findall(rest)}
+    return classes <= vocabulary["classes"] and ids <= vocabulary["ids"] and tags <= vocabulary["tags"]
+
+
+def document_vocabulary(html: str, fragments: list[str]) -> dict[str, set[str]]:
+    """The tags, classes and ids of the document, fragments are HTML that ends up in it (only their tags count)"""
+    classes = {name for value in CLASS_ATTRIBUTE_PATTERN.findall(html) for name in value.split()}
+    # Vue class bindings like :class="{ 'block': exp.highlight }" name their classes in quotes
+    classes |= {name for value in CLASS_BINDING_PATTERN.findall(html) for name in re.findall(r"'([^']+)'", value)}
+    tags = {"html", "head", "body"}
+    for fragment in (html, *fragments):
+        tags |= {tag.lower() for tag in TAG_NAME_PATTERN.findall(fragment)}
+    return {"tags": tags, "classes": classes, "ids": set(ID_ATTRIBUTE_PATTERN.findall(html))}
+
+
+def critical_css(css: str, vocabulary: dict[str, set[str]]) -> str:
+    """The rules of css that can apply to the document, in their original order"""
+    kept = []
+    for prelude, block in split_rules(css):
+        if block is None:
+            continue
+        if prelude.startswith("@media"):
+            inner = critical_css(block, vocabulary)
+            if inner:
+                kept.append(f"{prelude}{{{inner}}}")
+        elif prelude.startswith("@") or any(selector_matches(selector, vocabulary) for selector in split_selectors(prelude)):
+            kept.append(f"{prelude}{{{block}}}")
+    return "".join(kept)
+
+
+def inline_critical_css(html: str, directory: str, fragments: list[str]) -> tuple[str, int]:
+    """
+    Replaces every stylesheet link with the critical rules of the stylesheet and loads the whole stylesheet
+    without blocking rendering (as a preload that turns itself into a stylesheet, a plain link without JavaScript).
+    Returns the new document and the number of bytes inlined.
+    """
+    vocabulary = document_vocabulary(html, fragments)
+    inlined = 0
+    for tag in TAG_PATTERNS["style"].findall(html):
+        href = attribute(tag, "href")
+        url = resolve(href or "", "/" + DOCUMENT)
+        if url is None or "<noscript>" + tag in html:
+            continue
+        with open(os.path.join(directory, url.lstrip("/")), encoding="utf-8") as file:
+            critical = critical_css(file.read(), vocabulary)
+        inlined += len(critical.encode("utf-8"))
+        html = html.replace(tag, (
+            f"<style>{critical}</style>"
+            f'<link rel="preload" href="{href}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+            f"<noscript>{tag}</noscript>"
+        ), 1)
+    return html, inlined
+
+
+def minify_html(html: str) -> str:
+    """Removes comments and the whitespace that doesn't show, the content of scripts and styles is left alone"""
+    raw_contents: list[str] = []
+
+    def keep(match: re.Match) -> str:
+        raw_contents.append(match.group(3))
+        return f"{match.group(1)}\0{len(raw_contents) - 1}\0{match.group(4)}"
+
+    html = RAW_ELEMENT_PATTERN.sub(keep, HTML_COMMENT_PATTERN.sub("", html))
+    html = BLOCK_TAG_PATTERN.sub(r"\1", re.sub(r"\s+", " ", html)).strip()
+    return re.sub(r"\0(\d+)\0", lambda match: raw_contents[int(match.group(1))], html)
+
+
+def minify_js(source: str) -> str:
+    """
+    Removes comments and whitespace. Line breaks are only removed where they can't end a statement, so that
+    automatic semicolon insertion works out the same.
+    """
+    tokens: list[str] = []
+    pending = ""
+    for match in JS_TOKEN_PATTERN.finditer(source):
+        kind, token = match.lastgroup, match.group()
+        if kind == "comment":
+            pending = pending or " "
+            if "\n" in token:
+                pending = "\n"
+            continue
+        if kind == "space":
+            pending = "\n" if "\n" in token or pending == "\n" else " "
+            continue
+        token = token.strip() if kind == "regex" else token
+        if pending and tokens:
+            before, after = tokens[-1][-1], token[0]
+            if pending == "\n" and before not in CONTINUES_AFTER and after not in CONTINUES_BEFORE:
+                tokens.append("\n")
+            elif (before in IDENTIFIER_CHARACTERS and after in IDENTIFIER_CHARACTERS) \
+                    or (before in "+-" and after in "+-") or (before == "/" and after == "/"):
+                tokens.append(" ")
+        pending = ""
+        tokens.append(token)
+    return "".join(tokens)
+
+
+def minify_directory(directory: str, storage: Storage) -> list[tuple[str, int, int]]:
+    """
+    Inlines the critical CSS into the document and minifies it and the scripts, in place like fingerprint.py, so
+    it has to run before that. The HTML in the data files of storage counts as part of the document. Returns the
+    size of every file before and after, as well as the bytes that have to arrive before the page can render
+    (the document and its stylesheets).
+    """
+    fragments = [storage.read(name)[1].decode("utf-8") for name in sorted(storage.stamps())]
+
+    sizes = []
+    path = os.path.join(directory, DOCUMENT)
+    with open(path, encoding="utf-8") as file:
+        html = file.read()
+    render_blocking = len(html.encode("utf-8"))
+    for tag in TAG_PATTERNS["style"].findall(html):
+        url = resolve(attribute(tag, "href") or "", "/" + DOCUMENT)
+        if url is not None and "<noscript>" + tag not in html:
+            render_blocking += os.path.getsize(os.path.join(directory, url.lstrip("/")))
+    inlined_html, _ = inline_critical_css(html, directory, fragments)
+    minified = minify_html(inlined_html)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(minified)
+    sizes.append((DOCUMENT, len(html.encode("utf-8")), len(minified.encode("utf-8"))))
+    sizes.append(("render-blocking", render_blocking, len(minified.encode("utf-8"))))
+
+    for script in SCRIPTS:
+        path = os.path.join(directory, script)
+        with open(path, encoding="utf-8") as file:
+            source = file.read()
+        minified = minify_js(source)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(minified)
+        sizes.append((script, len(source.encode("utf-8")), len(minified.encode("utf-8"))))
+    return sizes
+
+
+if __name__ == "__main__":
+    storage = open_storage(os.environ.get("CV_CONTENT_STORAGE", os.environ.get("CV_CONTENT_DIRECTORY", "content")))
+    for name, before, after in minify_directory(sys.argv[1] if len(sys.argv) > 1 else "public", storage):
+        print(f"{name}: {before} -> {after} bytes ({after - before:+d})")
+    storage.close()
@@ -0,0 +1,41 @@
+import hmac
+import logging
+import os
+from typing import Mapping, Optional
+
+from pydantic import ValidationError
+
+from db import PersonalData
+
+logger = logging.getLogger(__name__)
+
+# The personal data is read from these environment variables, so that it does not need to be stored inside of git
+ENVIRONMENT_VARIABLES = {
+    "name": "CV_NAME",
+    "telephone": "CV_TELEPHONE",
+    "email": "CV_EMAIL",
+    "address_street": "CV_ADDRESS_STREET",
+    "address_zip": "CV_ADDRESS_ZIP",
+    "address_city": "CV_ADDRESS_CITY",
+    "nationality": "CV_NATIONALITY",
+    "date_of_birth": "CV_DATE_OF_BIRTH",
+}
+
+
+def load_personal_data(environ: Mapping[str, str] = os.environ) -> Optional[PersonalData]:
+    """Validates the personal data once, returns None if it is not configured correctly"""
+    try:
+        return PersonalData(**{field: environ.get(variable) for field, variable in ENVIRONMENT_VARIABLES.items()})
+    except ValidationError as error:
+        logger.warning("The personal data is not available, check the CV_* environment variables: %s", error)
+        return None
+
+
+def secret_matches(supplied: str, expected: Optional[str]) -> bool:
+    """
+    Compares the secrets in constant time, so that the response time doesn't tell how much of a guess was right.
+    The case is ignored on both sides, like it always was for the secrets people type in from a printed CV.
+    """
+    if not expected:
+        return False
+    return hmac.compare_digest(supplied.lower().encode("utf-8"), expected.lower().encode("utf-8"))
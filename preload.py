@@ -0,0 +1,114 @@
+import os
+import posixpath
+import re
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from fingerprint import REFERENCE_PATTERNS
+from images import ImageVariants
+from render import PROFILE_PICTURE_SIZES
+
+TAG_PATTERNS = {
+    "style": re.compile(r'<link\b[^>]*\brel="stylesheet"[^>]*>'),
+    "script": re.compile(r'<script\b[^>]*\btype="module"[^>]*>'),
+    "image": re.compile(r"<img\b[^>]*>"),
+}
+
+# The pages the links are sent for, the rendered one and the template StaticFiles serves
+DOCUMENT_PATHS = frozenset({"/", "/index.html"})
+
+
+def attribute(tag: str, name: str) -> Optional[str]:
+    # Vue bindings like :src="…" are not the attribute itself
+    match = re.search(r'(?<![\w:@-])' + name + r'="([^"]*)"', tag)
+    return match.group(1) if match else None
+
+
+def resolve(url: str, base: str) -> Optional[str]:
+    if "://" in url or url.startswith(("data:", "//")):
+        return None
+    return posixpath.normpath(posixpath.join(posixpath.dirname(base), url))
+
+
+def module_imports(directory: str, url: str, seen: set[str]) -> list[str]:
+    """The URLs of url and of every module it imports statically, depth first and each one only once"""
+    if url in seen:
+        return []
+    seen.add(url)
+    try:
+        with open(os.path.join(directory, url.lstrip("/")), encoding="utf-8") as file:
+            source = file.read()
+    except OSError:
+        return [url]
+
+    modules = [url]
+    for match in REFERENCE_PATTERNS[".js"].finditer(source):
+        imported = resolve(match.group("url"), url)
+        if imported is not None:
+            modules += module_imports(directory, imported, seen)
+    return modules
+
+
+def find_preloads(directory: str, image_variants: ImageVariants, document: str = "index.html") -> list[str]:
+    """
+    Returns the Link header values for the resources the page needs before it can be shown: the stylesheets,
+    the module scripts including everything they import, and the first image. Meant to be called once at startup.
+    Stylesheets that minify.py made load without blocking are left out, preloading them would compete with the
+    page for the bandwidth their inlined critical rules saved.
+    """
+    with open(os.path.join(directory, document), encoding="utf-8") as file:
+        html = file.read()
+    base = "/" + document
+
+    links = []
+    for tag in TAG_PATTERNS["style"].findall(html):
+        href = resolve(attribute(tag, "href") or "", base)
+        if href and "<noscript>" + tag not in html:
+            links.append(f"<{href}>; rel=preload; as=style")
+
+    seen: set[str] = set()
+    for tag in TAG_PATTERNS["script"].findall(html):
+        src = resolve(attribute(tag, "src") or "", base)
+        if src:
+            links += [f"<{module}>; rel=modulepreload" for module in module_imports(directory, src, seen)]
+
+    for tag in TAG_PATTERNS["image"].findall(html):
+        src = resolve(attribute(tag, "src") or "", base)
+        if not src:
+            continue
+        link = f"<{src}>; rel=preload; as=image"
+        srcset = image_variants.srcset(posixpath.basename(src)) if src.startswith(image_variants.url_path) else None
+        if srcset:
+            link += f'; imagesrcset="{srcset}"; imagesizes="{PROFILE_PICTURE_SIZES}"'
+        links.append(link)
+        break
+    return links
+
+
+class PreloadMiddleware:
+    """
+    Adds a Link header with the preloads to every successful response for the page. If the server supports
+    the early hints extension, they are also sent as 103 Early Hints before the app starts working on the response.
+    """
+
+    def __init__(self, app: ASGIApp, links: list[str]):
+        self.app = app
+        self.links = [link.encode("latin-1") for link in links]
+        self.header = (b"link", b", ".join(self.links))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD") or scope["path"] not in DOCUMENT_PATHS \
+                or not self.links:
+            await self.app(scope, receive, send)
+            return
+
+        if "http.response.early_hint" in scope.get("extensions", {}):
+            await send({"type": "http.response.early_hint", "links": self.links})
+
+        async def send_with_links(message: Message):
+            if message["type"] == "http.response.start" and message["status"] in (200, 304):
+                message["headers"] = [*message.get("headers", []), self.header]
+            await send(message)
+
+        await self.app(scope, receive, send_with_links)
@@ -0,0 +1,200 @@
+import asyncio
+import base64
+import hashlib
+import io
+import logging
+import os
+from html import escape
+
+from starlette.concurrency import run_in_threadpool
+
+from cache import CachedResponse
+from db import Language
+from images import FORMATS, Image, ImageVariants
+from render import DEFAULT_PROFILE, Profile
+
+logger = logging.getLogger(__name__)
+
+# Changing the markup or the stylesheet below has to invalidate the documents already rendered to disk
+PRINT_FORMAT = 2
+
+PICTURE = "profilepicture-sm.jpeg"
+# About 3.5 cm on paper at 230 dpi, sharp enough for printing and small enough to inline
+PICTURE_WIDTH = 320
+
+STYLESHEET = """
+@page { size: A4; margin: 18mm 16mm; }
+* { box-sizing: border-box; }
+body { margin: 0; font: 10.5pt/1.45 "Helvetica Neue", Arial, sans-serif; color: #111; }
+header { display: flex; align-items: center; gap: 8mm; margin-bottom: 6mm; }
+header img { width: 32mm; height: 32mm; border-radius: 50%; object-fit: cover; }
+h1 { margin: 0; font-size: 22pt; }
+h2 { margin: 6mm 0 2mm; padding-bottom: 1mm; font-size: 13pt; border-bottom: 0.3mm solid #999; break-after: avoid; }
+h3 { margin: 0; font-size: 11pt; }
+p { margin: 0 0 1.5mm; }
+a { color: inherit; text-decoration: none; }
+header p a::after { content: " (" attr(href) ")"; font-size: 9pt; color: #555; }
+.entry { margin-bottom: 3.5mm; break-inside: avoid; }
+.meta { color: #444; }
+ul { margin: 0; padding-left: 5mm; }
+li { margin-bottom: 1.5mm; break-inside: avoid; }
+@media screen { body { max-width: 210mm; margin: 8mm auto; padding: 0 12mm; } }
+""".strip()
+
+
+def downscale(path: str, width: int) -> bytes:
+    """The image at path as a JPEG that is at most width wide, the file itself if Pillow is missing"""
+    if Image is None:
+        logger.warning("Pillow is not installed, the printable CV contains %s in its full size", path)
+        with open(path, "rb") as file:
+            return file.read()
+    with Image.open(path) as source:
+        source = source.convert("RGB")
+        if source.width > width:
+            source = source.resize((width, round(source.height * width / source.width)), Image.LANCZOS)
+        output = io.BytesIO()
+        source.save(output, format="JPEG", **FORMATS["jpeg"]["options"])
+        return output.getvalue()
+
+
+def picture_data_uri(image_variants: ImageVariants, images_directory: str) -> str:
+    """
+    The smallest JPEG variant that is at least PICTURE_WIDTH wide. Without such a variant (e.g. if images.py
+    hasn't run), the original is downscaled to PICTURE_WIDTH.
+    """
+    entry = image_variants.manifest.get(PICTURE, {"variants": {}})
+    candidates = sorted(
+        (variant["width"], key) for key, variant in entry["variants"].items() if key in image_variants.variants
+    )
+    suitable = [key for width, key in candidates if width >= PICTURE_WIDTH]
+    if suitable:
+        with open(image_variants.variants[suitable[0]]["jpeg"], "rb") as file:
+            picture = file.read()
+    else:
+        picture = downscale(os.path.join(images_directory, PICTURE), PICTURE_WIDTH)
+    return "data:image/jpeg;base64," + base64.b64encode(picture).decode("ascii")
+
+
+def render_entry(title: str, meta: str, description: str) -> str:
+    """meta and description are HTML already, the title is escaped"""
+    return f'<div class="entry"><h3>{escape(title)}</h3><p class="meta">{meta}</p><p>{description}</p></div>'
+
+
+def render_print(
+        language: Language,
+        elements: dict[str, str],
+        sections: dict[str, list],
+        picture: str,
+        profile: Profile = DEFAULT_PROFILE,
+) -> str:
+    """
+    Renders a self-contained HTML document of the CV that is meant to be printed or saved: the stylesheet
+    and the profile picture are inlined and there is no script. Descriptions contain HTML, like in render.py.
+    """
+    parts = [
+        f'<!DOCTYPE html><html lang="{language.value}"><head><meta charset="utf-8">',
+        f'<title>{escape(profile.name)} – {escape(elements["application_as"])}</title>',
+        f'<style>{STYLESHEET}</style></head><body>',
+        f'<header><img src="{picture}" alt="{escape(elements["image_alt"])}"><div>',
+        f'<h1>{escape(profile.name)}</h1><p>{escape(elements["application_as"])}</p>',
+        '<p>' + ' · '.join(
+            f'<a href="{escape(url)}">{escape(label)}</a>' for url, label in profile.links(profile.website_host)
+        ) + '</p>',
+        '</div></header>',
+        f'<h2>{escape(elements["glance_header"])}</h2><p>{elements["glance_copy"]}</p>',
+        f'<h2>{escape(elements["experience_header"])}</h2>',
+    ]
+    for exp in sections["experiences"]:
+        parts.append(render_entry(
+            exp.title, f'{escape(exp.company)}, {escape(exp.start_date)} — {escape(exp.end_date)}', exp.description,
+        ))
+
+    parts.append(f'<h2>{escape(elements["education_header"])}</h2>')
+    for edu in sections["education"]:
+        parts.append(render_entry(
+            edu.title, f'{escape(edu.institute)}, {escape(edu.start_date)} — {escape(edu.end_date)}', edu.description,
+        ))
+
+    parts.append(f'<h2>{escape(elements["volunteering_header"])}</h2>')
+    for vol in sections["volunteering"]:
+        parts.append(render_entry(
+            vol.title, f'{escape(vol.organisation)}, {escape(vol.start_date)} — {escape(vol.end_date)}', vol.description,
+        ))
+
+    parts.append(f'<h2>{escape(elements["trivia_header"])}</h2><ul>')
+    for trv in sections["trivia"]:
+        parts.append(f'<li>{trv.content}</li>')
+    parts.append('</ul></body></html>')
+    return "".join(parts)
+
+
+class PrintCache:
+    """
+    The printable documents, rendered at most once per language and content. They are kept in memory and in
+    directory, so that a restart (or another worker) does not have to render them again. Renders run in the
+    threadpool, and requests that arrive while a document is being rendered wait for that render instead of
+    starting their own.
+    """
+
+    def __init__(self, directory: str, images_directory: str = "public/images"):
+        self.directory = directory
+        self.images_directory = images_directory
+        self.documents: dict[Language, tuple[str, CachedResponse]] = {}
+        self.renders: dict[str, asyncio.Future] = {}
+
+    def key(self, site, language: Language) -> str:
+        """Changes with the content of the language, the profile, the picture and the format of the document"""
+        picture = site.image_variants.manifest.get(PICTURE, {}).get("hash", "")
+        bundle = site.payloads["bundle", language].digest
+        profile = "" if site.profile == DEFAULT_PROFILE else f":{site.profile!r}"
+        return hashlib.sha256(
+            f"{PRINT_FORMAT}:{language.value}:{bundle}:{picture}{profile}".encode()
+        ).hexdigest()[:16]
+
+    def path(self, language: Language, key: str) -> str:
+        return os.path.join(self.directory, f"cv-{language.value}-{key}.html")
+
+    async def get(self, site, language: Language) -> CachedResponse:
+        key = self.key(site, language)
+        cached = self.documents.get(language)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        render = self.renders.get(key)
+        if render is None:
+            render = self.renders[key] = asyncio.ensure_future(run_in_threadpool(self.load_or_render, site, language, key))
+            render.add_done_callback(lambda _: self.renders.pop(key, None))
+        document = await asyncio.shield(render)
+        self.documents[language] = (key, document)
+        return document
+
+    def load_or_render(self, site, language: Language, key: str) -> CachedResponse:
+        path = self.path(language, key)
+        try:
+            with open(path, "rb") as file:
+                body = file.read()
+        except FileNotFoundError:
+            body = render_print(
+                language,
+                site.language_kits[language].elements,
+                {section: entries[language] for section, entries in site.content.sections.items()},
+                picture_data_uri(site.image_variants, self.images_directory),
+                site.profile,
+            ).encode("utf-8")
+            self.store(path, language, body)
+        return CachedResponse(body, media_type="text/html; charset=utf-8")
+
+    def store(self, path: str, language: Language, body: bytes):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Written under a temporary name first, so that other workers never read half a document
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as file:
+                file.write(body)
+            os.replace(temporary, path)
+            for name in os.listdir(self.directory):
+                if name.startswith(f"cv-{language.value}-") and name.endswith(".html") and name != os.path.basename(path):
+                    os.remove(os.path.join(self.directory, name))
+        except OSError as error:
+            # The document is still served from memory, it only has to be rendered again after a restart
+            logger.warning("Could not store the printable CV in %s: %s", self.directory, error)
@@ -1,9 +1,9 @@
 import {createApp} from '../dist/vue.esm-browser.js'
 
 createApp({
+    template: '#app-template',
     data() {
         return {
-            show_js_warning: false,
             elements: {},
             experiences: null,
             education: null,
@@ -16,21 +16,15 @@ createApp({
     },
     methods: {
         fetchData() {
-            fetch('/elements/' + this.language)
+            fetch('bundle/' + this.language)
                 .then(response => response.json())
-                .then(data => this.elements = data);
-            fetch('/experiences/' + this.language)
-                .then(response => response.json())
-                .then(data => this.experiences = data);
-            fetch('/education/' + this.language)
-                .then(response => response.json())
-                .then(data => this.education = data);
-            fetch('/volunteering/' + this.language)
-                .then(response => response.json())
-                .then(data => this.volunteering = data);
-            fetch('/trivia/' + this.language)
-                .then(response => response.json())
-                .then(data => this.trivia = data);
+                .then(data => {
+                    this.elements = data.elements;
+                    this.experiences = data.experiences;
+                    this.education = data.education;
+                    this.volunteering = data.volunteering;
+                    this.trivia = data.trivia;
+                });
         },
         switchLanguage() {
             if (this.language === "en") {
@@ -38,19 +32,49 @@ createApp({
             } else if (this.language === "de") {
                 this.language = "en"
             }
+            // Remembered for the next visit, so that the server renders the page in this language right away
+            document.cookie = 'language=' + this.language + '; path=/; max-age=31536000; SameSite=Lax';
             this.fetchData();
         },
+        loadInitialData() {
+            // The server inlines the data it rendered the page with, so there is nothing to fetch on the first load
+            const initialData = document.getElementById('initial-data');
+            if (initialData === null) {
+                return false;
+            }
+            const data = JSON.parse(initialData.textContent);
+            this.language = data.language;
+            this.elements = data.elements;
+            this.experiences = data.experiences;
+            this.education = data.education;
+            this.volunteering = data.volunteering;
+            this.trivia = data.trivia;
+            return true;
+        },
         processPersonalDataPromise(data) {
-            if (data['status_code'] !== 401) {
+            if (data !== null) {
                 this.personal_data = data;
                 this.personal_data_success = true;
             }
         }
     },
+    created() {
+        if (!this.loadInitialData()) {
+            this.fetchData();
+        }
+    },
     mounted() {
-        this.fetchData();
-        fetch('/personal_data?secret=' + document.location.hash.substring(1))
-            .then(response => response.json())
-            .then(data => this.processPersonalDataPromise(data));
+        // Without a secret in the hash of the URL there is no point in asking for the personal data
+        if (document.location.hash.length > 1) {
+            fetch('personal_data?secret=' + document.location.hash.substring(1))
+                .then(response => response.ok ? response.json() : null)
+                .then(data => this.processPersonalDataPromise(data));
+        }
     },
-}).mount('#app')
\ No newline at end of file
+}).mount('#app')
+
+// Repeat and offline visits are answered from the cache of the service worker, see serviceworker.py.
+// The URLs are relative, so that every tenant below /t/<name>/ gets its own worker, see tenants.py.
+if ('serviceWorker' in navigator) {
+    window.addEventListener('load', () => navigator.serviceWorker.register('service-worker.js'));
+}
\ No newline at end of file
@@ -0,0 +1,33 @@
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    """
+    Allows every client a burst of capacity requests, after that one request per 1 / refill_rate seconds.
+    Only the most recently seen max_clients are remembered, so that a flood of addresses can't exhaust memory.
+    """
+
+    def __init__(self, capacity: float, refill_rate: float, max_clients: int = 10000):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.max_clients = max_clients
+        # client -> (tokens left, time of the last update)
+        self.buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def acquire(self, client: str) -> float:
+        """Takes a token from the bucket of client, returns 0 if that worked or the seconds until it would"""
+        now = time.monotonic()
+        tokens, updated = self.buckets.pop(client, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated) * self.refill_rate)
+
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+        else:
+            wait = (1 - tokens) / self.refill_rate
+
+        self.buckets[client] = (tokens, now)
+        if len(self.buckets) > self.max_clients:
+            self.buckets.popitem(last=False)
+        return wait
@@ -0,0 +1,178 @@
+import re
+from functools import lru_cache
+from html import escape
+from typing import NamedTuple, Optional
+from urllib.parse import urlsplit
+
+from db import Language
+
+# The language the page is rendered in when the visitor did not ask for one, matches main.js
+DEFAULT_LANGUAGE = Language.de
+
+# Set by main.js when the visitor switches the language, it takes precedence over Accept-Language
+LANGUAGE_COOKIE = "language"
+
+APP_PLACEHOLDER = '<div id="app"></div>'
+
+# Matches the width classes of the profile picture, so that the browser can pick from its srcset early
+PROFILE_PICTURE_SIZES = "(min-width: 1024px) 25vw, (min-width: 768px) 33vw, (min-width: 640px) 50vw, 83vw"
+
+HIGHLIGHT_CLASSES = "block absolute -inset-1 -skew-y-3 bg-green-200"
+
+
+class Profile(NamedTuple):
+    """Who a CV belongs to, links that are empty are left out"""
+    name: str
+    website: str = ""
+    github: str = ""
+    linkedin: str = ""
+
+    def links(self, website_label: str) -> list[tuple[str, str]]:
+        """The (URL, label) of every link in the order they are shown"""
+        labels = {"website": website_label, "github": "GitHub", "linkedin": "LinkedIn"}
+        return [(getattr(self, field), label) for field, label in labels.items() if getattr(self, field)]
+
+    @property
+    def website_host(self) -> str:
+        return urlsplit(self.website).netloc or self.website
+
+
+# The owner of the CV in content/, public/index.html is written for them
+DEFAULT_PROFILE = Profile(
+    name="Tom Wolfskämpf",
+    website="https://wolfskaempf.de",
+    github="https://github.com/wolfskaempf",
+    linkedin="https://www.linkedin.com/in/tom-wolfsk%C3%A4mpf/",
+)
+
+
+def personalize_template(template: str, profile: Profile) -> str:
+    """
+    Puts the name and links of profile into an index.html that was written for DEFAULT_PROFILE, so that the Vue
+    template and the title show the owner of the CV. Links the profile doesn't have are removed together with
+    their separator.
+    """
+    if profile == DEFAULT_PROFILE:
+        return template
+    for field in ("website", "github", "linkedin"):
+        default_url, url = getattr(DEFAULT_PROFILE, field), getattr(profile, field)
+        if url:
+            template = template.replace(f'"{default_url}"', f'"{escape(url)}"')
+            continue
+        anchor = r'<a href="' + re.escape(default_url) + r'"[^>]*>.*?</a>'
+        for pattern in (anchor + r"\s*\|\s*", r"\s*\|\s*" + anchor, anchor):
+            template, count = re.subn(pattern, "", template, flags=re.DOTALL)
+            if count:
+                break
+    # Points at the page of the default CV, the URL of a tenant depends on the host it is requested with
+    template = re.sub(r'\s*<meta property="og:url"[^>]*>', "", template)
+    return template.replace(DEFAULT_PROFILE.name, escape(profile.name))
+
+
+@lru_cache(maxsize=256)
+def negotiate_language(accept_language: str) -> Optional[Language]:
+    """Returns the available language the visitor prefers most according to Accept-Language, if any"""
+    candidates = []
+    for position, part in enumerate(accept_language.split(",")):
+        tag, _, parameters = part.strip().partition(";")
+        quality = 1.0
+        parameter = parameters.strip()
+        if parameter.startswith("q="):
+            try:
+                quality = float(parameter[2:])
+            except ValueError:
+                continue
+        # en-GB and en-US are served the same English content
+        primary = tag.strip().lower().split("-")[0]
+        if quality > 0 and primary in Language.__members__:
+            candidates.append((-quality, position, Language(primary)))
+    return min(candidates)[2] if candidates else None
+
+
+def render_highlightable(entry, body: str) -> str:
+    """Wraps an entry the same way the Vue template does, including the green marker for highlights"""
+    if entry.highlight:
+        return (f'<div class="relative"><span class="{HIGHLIGHT_CLASSES}" aria-hidden="true"></span>'
+                f'<div class="relative">{body}</div></div>')
+    return f'<div class="relative"><span aria-hidden="true"></span><div>{body}</div></div>'
+
+
+def render_cv(
+        language: Language,
+        elements: dict[str, str],
+        sections: dict[str, list],
+        profile: Profile = DEFAULT_PROFILE,
+) -> str:
+    """
+    Renders the markup of the Vue template in public/index.html for one language. Descriptions and the
+    glance copy contain HTML on purpose (they are rendered with v-html), everything else is escaped.
+    """
+    other_language = Language.en if language == Language.de else Language.de
+    parts = [
+        f'<div lang="{language.value}"><div class="xl:px-60 p-8"><div class="relative"><div class="absolute right-1">',
+        f'<a class="rounded bg-blue-100 hover:bg-blue-200 ease-linear duration-100 p-1" '
+        f'href="?language={other_language.value}">{escape(elements["switch_language"])}</a>',
+        '</div></div><div class="flex items-center justify-center flex-wrap gap-x-20 gap-y-12">',
+        f'<img class="rounded-full lg:w-1/4 md:w-1/3 sm:w-1/2 w-5/6" src="/images/profilepicture-sm.jpeg" '
+        f'sizes="{PROFILE_PICTURE_SIZES}" alt="{escape(elements["image_alt"])}">',
+        f'<div class="relative text-center"><h1 class="text-5xl ">{escape(profile.name)}</h1>',
+        f'<p>{escape(elements["application_as"])}</p>',
+        '<p>' + ' | '.join(
+            f'<a href="{escape(url)}" target="_blank">{escape(label)}</a>'
+            for url, label in profile.links(elements["website"])
+        ) + '</p>',
+        '</div></div></div>',
+        '<div class="xl:px-64 lg:px-32 md:px-16 p-8"><div class="prose md:prose-xl">',
+        f'<h2>{escape(elements["glance_header"])}</h2><p>{elements["glance_copy"]}</p>',
+        f'<h2>{escape(elements["experience_header"])}</h2>',
+    ]
+    for exp in sections["experiences"]:
+        parts.append(render_highlightable(exp, (
+            f'<h3 class="mb-0">{escape(exp.title)}</h3><p class="mb-0">{escape(exp.company)}</p>'
+            f'<p class="mt-0">{escape(exp.start_date)} — {escape(exp.end_date)}</p><p>{exp.description}</p>'
+        )))
+
+    parts.append(f'<h2>{escape(elements["education_header"])}</h2>')
+    for edu in sections["education"]:
+        parts.append(
+            f'<div><h3 class="mb-0">{escape(edu.title)}</h3>'
+            f'<p>{escape(edu.start_date)} — {escape(edu.end_date)} @ {escape(edu.institute)}</p>'
+            f'<p>{edu.description}</p></div>'
+        )
+
+    parts.append(f'<h2>{escape(elements["volunteering_header"])}</h2>')
+    for vol in sections["volunteering"]:
+        parts.append(render_highlightable(vol, (
+            f'<h3 class="mb-0">{escape(vol.title)}</h3><p class="mb-0">{escape(vol.organisation)}</p>'
+            f'<p class="mt-0">{escape(vol.start_date)} — {escape(vol.end_date)}</p><p>{vol.description}</p>'
+        )))
+
+    parts.append(f'<div><h2>{escape(elements["trivia_header"])}</h2><ul>')
+    for trv in sections["trivia"]:
+        parts.append(f'<li>{trv.content}</li>')
+    parts.append('</ul></div>')
+
+    # Personal data is only ever fetched by the browser, as it depends on the secret in the hash of the URL
+    parts.append(
+        f'<div><h2>{escape(elements["personal_data_header"])}</h2>'
+        f'<div><p>{escape(elements["personal_data_access_denied"])}</p></div></div>'
+    )
+    parts.append('</div></div></div>')
+    return "".join(parts)
+
+
+def render_page(template: str, language: Language, markup: str, initial_data: bytes) -> str:
+    """
+    Inserts the rendered CV and the data it was rendered from into the index.html template, so that Vue
+    can take over without fetching anything
+    """
+    # "</" must not appear inside of a script element, "<\/" is an equivalent escape in JSON
+    data = initial_data.decode("utf-8").replace("</", "<\\/")
+    return (
+        template
+        .replace("<html>", f'<html lang="{language.value}">', 1)
+        .replace(APP_PLACEHOLDER, (
+            f'<div id="app">{markup}</div>\n'
+            f'<script id="initial-data" type="application/json">{data}</script>'
+        ), 1)
+    )
@@ -0,0 +1,161 @@
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from html import unescape
+from typing import Optional
+
+from cache import LRUCache, dump_json
+from content import Content
+from db import Language
+
+# The fields that are searched per section, the first one is shown as the title of a result
+SEARCHED_FIELDS = {
+    "experiences": ("title", "company", "description"),
+    "education": ("title", "institute", "description"),
+    "volunteering": ("title", "organisation", "description"),
+    "trivia": ("content",),
+}
+TITLE_WEIGHT = 2.0
+# Trivia only consist of their content, which is cut off to be shown as a title
+MAX_TITLE_LENGTH = 80
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# The last word of a query is treated as a prefix for type-ahead, but only expanded to this many words
+MAX_PREFIX_EXPANSIONS = 50
+
+TAG_PATTERN = re.compile(r"<[^>]+>")
+WORD_PATTERN = re.compile(r"\w+")
+UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+
+
+def strip_html(text: str) -> str:
+    return unescape(TAG_PATTERN.sub(" ", text))
+
+
+def summarize(text: str) -> str:
+    title = " ".join(strip_html(text).split())
+    return title if len(title) <= MAX_TITLE_LENGTH else title[:MAX_TITLE_LENGTH - 1].rstrip() + "…"
+
+
+def remove_accents(word: str) -> str:
+    return "".join(character for character in unicodedata.normalize("NFKD", word) if not unicodedata.combining(character))
+
+
+def tokenize(text: str) -> list[str]:
+    return WORD_PATTERN.findall(strip_html(text).lower())
+
+
+def index_forms(word: str) -> set[str]:
+    """
+    A word is indexed both with umlauts written out (ä -> ae) and with them reduced to their base letter (ä -> a),
+    so that "Universität" is found by "universitaet", "universitat" and "universität" alike
+    """
+    return {remove_accents(word.translate(UMLAUTS)), remove_accents(word.replace("ß", "ss"))}
+
+
+def query_form(word: str) -> str:
+    # A query that contains an umlaut matches the reduced form, a query without one matches one of the forms anyway
+    return remove_accents(word.replace("ß", "ss"))
+
+
+class Document:
+    """Where an entry can be found, serialized once, as it is part of every result that contains the entry"""
+    __slots__ = ("section", "title", "serialized")
+
+    def __init__(self, section: str, title: str, index: Optional[int] = None, key: Optional[str] = None):
+        self.section = section
+        self.title = title
+        location = {"section": section, "title": title, **({"index": index} if key is None else {"key": key})}
+        self.serialized = dump_json(location)[:-1]
+
+    def result(self, score: float) -> bytes:
+        return b'%s,"score":%s}' % (self.serialized, repr(round(score, 4)).encode())
+
+
+class SearchIndex:
+    """
+    An inverted index over the content of one language. It is built once per content version, answering a query
+    only touches the postings of the words in it, never the content itself.
+    """
+
+    def __init__(self, content: Content, language: Language):
+        self.documents: list[Document] = []
+        self.lengths: list[float] = []
+        postings: dict[str, dict[int, float]] = defaultdict(dict)
+
+        def add(document: Document, fields: list[tuple[str, float]]):
+            document_id = len(self.documents)
+            self.documents.append(document)
+            length = 0.0
+            for text, weight in fields:
+                words = tokenize(text)
+                length += len(words)
+                for word in words:
+                    for form in index_forms(word):
+                        postings[form][document_id] = postings[form].get(document_id, 0.0) + weight
+            self.lengths.append(length)
+
+        for section, fields in SEARCHED_FIELDS.items():
+            for position, entry in enumerate(content.sections[section][language]):
+                values = [getattr(entry, field) for field in fields]
+                weighted = [(value, TITLE_WEIGHT if field == fields[0] else 1.0) for field, value in zip(fields, values)]
+                add(Document(section, summarize(values[0]), index=position), weighted)
+        for key, element in content.elements.items():
+            text = element.content[language]
+            add(Document("elements", key, key=key), [(text, 1.0)])
+
+        # The BM25 score of every word in every document is known up front, a query only adds them up
+        average_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        self.postings: dict[str, dict[int, float]] = {
+            word: self.score(frequencies, average_length) for word, frequencies in postings.items()
+        }
+        self.vocabulary = sorted(self.postings)
+        self.results = LRUCache(maxsize=1024)
+
+    def expand(self, word: str, prefix: bool) -> list[str]:
+        if not prefix:
+            return [word] if word in self.postings else []
+        start = bisect_left(self.vocabulary, word)
+        expansions = []
+        for candidate in self.vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not candidate.startswith(word):
+                break
+            expansions.append(candidate)
+        return expansions
+
+    def score(self, frequencies: dict[int, float], average_length: float) -> dict[int, float]:
+        """BM25 score of a word in every document that contains it"""
+        idf = math.log(1 + (len(self.documents) - len(frequencies) + 0.5) / (len(frequencies) + 0.5))
+        scores = {}
+        for document_id, frequency in frequencies.items():
+            normalization = K1 * (1 - B + B * self.lengths[document_id] / average_length)
+            scores[document_id] = idf * frequency * (K1 + 1) / (frequency + normalization)
+        return scores
+
+    def search(self, query: str, limit: int = 10) -> bytes:
+        """Returns the serialized results of all documents that contain every word of the query, best first"""
+        words = tuple(query_form(word) for word in tokenize(query))
+        # Different queries share the normalized words, so only the results are cached, never the query itself
+        results = self.results.get_or_build((words, limit), lambda: self.build_results(words, limit))
+        return b'{"query":%s,"results":[%s]}' % (dump_json(query), results)
+
+    def build_results(self, words: tuple[str, ...], limit: int) -> bytes:
+        totals: Optional[dict[int, float]] = None
+        for position, word in enumerate(words):
+            word_scores: dict[int, float] = {}
+            for expansion in self.expand(word, prefix=position == len(words) - 1):
+                for document_id, score in self.postings[expansion].items():
+                    word_scores[document_id] = max(word_scores.get(document_id, 0.0), score)
+            if totals is None:
+                totals = word_scores
+            else:
+                totals = {document_id: totals[document_id] + score
+                          for document_id, score in word_scores.items() if document_id in totals}
+            if not totals:
+                break
+
+        ranked = sorted((totals or {}).items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return b",".join(self.documents[document_id].result(score) for document_id, score in ranked)
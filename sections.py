@@ -0,0 +1,40 @@
+from typing import Optional
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from cache import CachedResponse, LRUCache
+
+
+class SectionIndex:
+    """
+    The entries of one section in one language. The highlighted entries are indexed when the index is built,
+    and every projection onto a subset of the fields is serialized once and then kept.
+    """
+
+    def __init__(self, model: type[BaseModel], entries: list[BaseModel]):
+        self.fields = tuple(model.__fields__)
+        self.has_highlight = "highlight" in self.fields
+        self.documents: list[dict] = jsonable_encoder(entries)
+        self.response = CachedResponse.from_content(self.documents)
+
+        self.highlights = tuple(index for index, entry in enumerate(entries) if getattr(entry, "highlight", False))
+        self.highlighted = (
+            CachedResponse.from_content([self.documents[index] for index in self.highlights])
+            if self.has_highlight else None
+        )
+        self.projections = LRUCache(maxsize=64)
+
+    def unknown_fields(self, fields) -> set[str]:
+        return set(fields).difference(self.fields)
+
+    def select(self, fields: Optional[set[str]] = None, highlight: bool = False) -> CachedResponse:
+        """Returns the entries (only the highlighted ones if asked to) with only the specified fields"""
+        selected = self.fields if fields is None else tuple(field for field in self.fields if field in fields)
+        if selected == self.fields:
+            return self.highlighted if highlight else self.response
+        return self.projections.get_or_build((selected, highlight), lambda: self.build_projection(selected, highlight))
+
+    def build_projection(self, fields: tuple[str, ...], highlight: bool) -> CachedResponse:
+        documents = [self.documents[index] for index in self.highlights] if highlight else self.documents
+        return CachedResponse.from_content([{field: document[field] for field in fields} for document in documents])
@@ -0,0 +1,130 @@
+import argparse
+import gc
+import logging
+import os
+import signal
+import sys
+import time
+
+import uvicorn
+
+logger = logging.getLogger("uvicorn.error")
+
+# A worker that dies this quickly after being started is most likely broken, restarting it would only spin
+MINIMUM_WORKER_LIFETIME = 1.0
+
+
+def default_workers() -> int:
+    """WEB_CONCURRENCY if it is set (like gunicorn and uvicorn use it), otherwise one worker per usable core"""
+    if os.environ.get("WEB_CONCURRENCY"):
+        return max(1, int(os.environ["WEB_CONCURRENCY"]))
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class Supervisor:
+    """
+    Imports the app once, freezes everything it allocated and forks the workers afterwards. The workers share the
+    content, the serialized and compressed responses and the indexes with the supervisor page by page, since the
+    garbage collector no longer writes to the frozen objects. A worker that dies is replaced by a new fork.
+    """
+
+    def __init__(self, config: uvicorn.Config, workers: int):
+        self.config = config
+        self.workers = workers
+        # pid -> (slot, time it was started), a replacement takes over the slot of the worker that died
+        self.children: dict[int, tuple[int, float]] = {}
+        self.stopping = False
+        # Set when a worker crashed right after starting, the supervisor then exits with an error as well
+        self.failed = False
+
+    def preload(self):
+        # The app divides per-process limits by the number of workers
+        os.environ["CV_WORKERS"] = str(self.workers)
+        # Importing main loads the content and builds every Site cache, see website.py
+        import main
+
+        self.config.app = main.app
+        self.metrics = main.metrics
+        gc.collect()
+        # Moves everything allocated so far into the permanent generation, collections in the workers then never
+        # touch (and thereby copy) the pages it lives in
+        gc.freeze()
+
+    def spawn(self, sock, slot: int):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            # Keeps the series of the workers apart, the slot (unlike the pid) survives a restart of the worker
+            self.metrics.worker = str(slot)
+            exit_code = 1
+            try:
+                uvicorn.Server(self.config).run(sockets=[sock])
+                exit_code = 0
+            finally:
+                # Never return into the loop of the supervisor
+                os._exit(exit_code)
+        self.children[pid] = (slot, time.monotonic())
+
+    def stop(self, signum, _frame):
+        self.stopping = True
+        for pid in self.children:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        sock = self.config.bind_socket()
+        self.preload()
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        logger.info("Started supervisor [%d], forking %d workers", os.getpid(), self.workers)
+        for slot in range(self.workers):
+            self.spawn(sock, slot)
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            child = self.children.pop(pid, None)
+            if child is None or self.stopping:
+                continue
+            slot, started = child
+            logger.warning("Worker [%d] exited with status %d", pid, os.waitstatus_to_exitcode(status))
+            if time.monotonic() - started < MINIMUM_WORKER_LIFETIME:
+                logger.error("Worker [%d] died right after starting, shutting down", pid)
+                self.failed = True
+                self.stop(signal.SIGTERM, None)
+                continue
+            self.spawn(sock, slot)
+        sock.close()
+        return 1 if self.failed or not self.stopping else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serves the app with several workers that share the preloaded content")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=default_workers(),
+                        help="defaults to WEB_CONCURRENCY or the number of usable cores")
+    parser.add_argument("--proxy-headers", action=argparse.BooleanOptionalAction, default=True,
+                        help="use X-Forwarded-For and X-Forwarded-Proto from the addresses in --forwarded-allow-ips")
+    parser.add_argument("--forwarded-allow-ips", default=None)
+    arguments = parser.parse_args()
+
+    supervisor = Supervisor(
+        uvicorn.Config(
+            "main:app",
+            host=arguments.host,
+            port=arguments.port,
+            proxy_headers=arguments.proxy_headers,
+            forwarded_allow_ips=arguments.forwarded_allow_ips,
+        ),
+        arguments.workers,
+    )
+    sys.exit(supervisor.run())
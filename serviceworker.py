@@ -0,0 +1,175 @@
+import hashlib
+import os
+
+from cache import CachedResponse, dump_json
+from db import Language
+from fingerprint import REFERENCE_PATTERNS
+from preload import module_imports, resolve
+from render import DEFAULT_LANGUAGE
+
+MANIFEST_URL = "precache-manifest.json"
+
+# The worker is generated, VERSION changes with every entry of the manifest, so browsers notice the new version
+# by comparing the bytes of the script. Unchanged entries are copied from the cache of the previous version,
+# only the ones with a new revision are fetched again. Every tenant (see tenants.py) has a worker of its own,
+# whose scope is the directory of its page, so the URLs of the site and the names of the caches depend on the scope.
+SCRIPT = """
+const VERSION = "%(version)s";
+const SCOPE = self.registration.scope;
+const MANIFEST_URL = new URL("%(manifest_url)s", SCOPE).href;
+const CACHE_PREFIX = "cv-" + SCOPE + "-";
+const PRECACHE = CACHE_PREFIX + "precache-" + VERSION;
+const RUNTIME = CACHE_PREFIX + "runtime-" + VERSION;
+const REVISIONS = new URL("__precache-revisions", SCOPE).href;
+const OFFLINE_PAGE = new URL("?language=%(default_language)s", SCOPE).href;
+// Depend on a secret or are not meant for visitors, so they are never cached
+const EXCLUDED = [
+    new URL("personal_data", SCOPE).pathname, "/internal/", new URL("service-worker.js", SCOPE).pathname,
+    new URL(MANIFEST_URL).pathname,
+];
+
+async function previousCaches() {
+    return (await caches.keys()).filter(name => name.startsWith(CACHE_PREFIX + "precache-") && name !== PRECACHE);
+}
+
+async function precache() {
+    const manifest = await (await fetch(MANIFEST_URL, {cache: "no-cache"})).json();
+    const cache = await caches.open(PRECACHE);
+    const revisions = {};
+    const previous = [];
+    for (const name of await previousCaches()) {
+        const cached = await caches.open(name);
+        const stored = await cached.match(REVISIONS);
+        previous.push([cached, stored ? await stored.json() : {}]);
+    }
+
+    await Promise.all(manifest.entries.map(async entry => {
+        const url = new URL(entry.url, SCOPE).href;
+        for (const [cached, cachedRevisions] of previous) {
+            const response = cachedRevisions[url] === entry.revision && await cached.match(url);
+            if (response) {
+                await cache.put(url, response);
+                revisions[url] = entry.revision;
+                return;
+            }
+        }
+        const response = await fetch(url, {cache: "no-cache", credentials: "omit"});
+        if (!response.ok) {
+            throw new Error("Could not precache " + url + ": " + response.status);
+        }
+        await cache.put(url, response);
+        revisions[url] = entry.revision;
+    }));
+    await cache.put(REVISIONS, new Response(JSON.stringify(revisions), {headers: {"Content-Type": "application/json"}}));
+}
+
+self.addEventListener("install", event => {
+    event.waitUntil(precache().then(() => self.skipWaiting()));
+});
+
+self.addEventListener("activate", event => {
+    event.waitUntil((async () => {
+        for (const name of await caches.keys()) {
+            if (name.startsWith(CACHE_PREFIX) && name !== PRECACHE && name !== RUNTIME) {
+                await caches.delete(name);
+            }
+        }
+        await self.clients.claim();
+    })());
+});
+
+async function respond(event, request, url) {
+    const precached = await (await caches.open(PRECACHE)).match(url.origin + url.pathname + url.search);
+    if (precached) {
+        return precached;
+    }
+
+    const runtime = await caches.open(RUNTIME);
+    if (request.mode === "navigate") {
+        // The page at / depends on the language cookie, which the cache knows nothing about, so the network is
+        // asked first and the cached page is only shown offline
+        try {
+            const response = await fetch(request);
+            if (response.ok) {
+                event.waitUntil(runtime.put(request, response.clone()));
+            }
+            return response;
+        } catch (error) {
+            return (await runtime.match(request)) || (await (await caches.open(PRECACHE)).match(OFFLINE_PAGE))
+                || Response.error();
+        }
+    }
+
+    // Image variants never change under their name
+    if (url.pathname.startsWith("/images/")) {
+        const cached = await runtime.match(request);
+        if (cached) {
+            return cached;
+        }
+        const response = await fetch(request);
+        if (response.ok) {
+            event.waitUntil(runtime.put(request, response.clone()));
+        }
+        return response;
+    }
+    return fetch(request);
+}
+
+self.addEventListener("fetch", event => {
+    const request = event.request;
+    const url = new URL(request.url);
+    if (request.method !== "GET" || url.origin !== self.location.origin
+        || EXCLUDED.some(prefix => url.pathname.startsWith(prefix))) {
+        return;
+    }
+    event.respondWith(respond(event, request, url));
+});
+""".lstrip()
+
+
+def precache_static_files(directory: str, document: str = "index.html") -> list[dict]:
+    """
+    The files the page refers to (icons, the stylesheet, the modules including their imports, the profile
+    picture) with the hash of their content as revision. Static files don't change while the app is running,
+    so this is meant to be called once at startup.
+    """
+    with open(os.path.join(directory, document), encoding="utf-8") as file:
+        html = file.read()
+
+    urls: list[str] = []
+    seen: set[str] = set()
+    for match in REFERENCE_PATTERNS[".html"].finditer(html):
+        url = resolve(match.group("url"), "/" + document)
+        if url is None or url in urls:
+            continue
+        urls += module_imports(directory, url, seen) if url.endswith(".js") else [url]
+
+    entries = []
+    for url in urls:
+        try:
+            with open(os.path.join(directory, url.lstrip("/")), "rb") as file:
+                revision = hashlib.sha256(file.read()).hexdigest()[:16]
+        except OSError:
+            # Not a file of the directory (e.g. a link to another site that only looks like a path), nothing to cache
+            continue
+        entries.append({"url": url, "revision": revision})
+    return entries
+
+
+class ServiceWorker:
+    """The precache manifest of one version of the site and the service worker script that belongs to it"""
+
+    def __init__(self, site, static_entries: list[dict]):
+        entries = list(static_entries)
+        for language in Language:
+            # Relative to the scope of the worker, which is the directory of the page
+            entries.append({"url": f"?language={language.value}", "revision": site.payloads["page", language].digest})
+            entries.append({"url": f"bundle/{language.value}", "revision": site.payloads["bundle", language].digest})
+
+        version = hashlib.sha256(dump_json(entries)).hexdigest()[:16]
+        self.manifest = CachedResponse.from_content({"version": version, "entries": entries})
+        self.script = CachedResponse(
+            (SCRIPT % {"version": version, "manifest_url": MANIFEST_URL, "default_language": DEFAULT_LANGUAGE.value})
+            .encode("utf-8"),
+            media_type="text/javascript; charset=utf-8",
+        )
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import marshal
+import os
+import sys
+from typing import Optional
+
+import content as content_module
+import db
+from content import DATA_FILES, SECTION_MODELS, Content, ContentStore
+from db import Element, Language
+from images import ImageVariants
+from storage import Storage, open_storage
+from website import Site, load_index_template
+
+# Bump this whenever the layout of the snapshot changes
+SNAPSHOT_FORMAT = 1
+
+
+def fingerprint(raw_files: dict[str, bytes]) -> str:
+    """
+    Identifies the data files together with the models they are validated against and the code that parses,
+    orders and splits them by language
+    """
+    digest = hashlib.sha256(f"{SNAPSHOT_FORMAT}:{sys.version_info[0]}.{sys.version_info[1]}".encode())
+    for module in (db, content_module):
+        with open(module.__file__, "rb") as source:
+            digest.update(source.read())
+    for name in sorted(raw_files):
+        digest.update(name.encode())
+        digest.update(hashlib.sha256(raw_files[name]).digest())
+    return digest.hexdigest()
+
+
+def read_snapshot(path: str, expected_fingerprint: str) -> Optional[dict]:
+    """Returns the snapshot stored at path, or None if there is none or it was made from other content"""
+    try:
+        with open(path, "rb") as file:
+            snapshot = marshal.load(file)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("fingerprint") != expected_fingerprint:
+        return None
+    return snapshot
+
+
+def elements_from_snapshot(data: list[dict]) -> dict[str, Element]:
+    # The data has been validated before it was written, so the models are constructed without validating again
+    return {
+        element["name"]: Element.construct(
+            name=element["name"],
+            content={Language(language): text for language, text in element["content"].items()},
+        )
+        for element in data
+    }
+
+
+def section_from_snapshot(model, data: dict[str, list[dict]]) -> dict[Language, list]:
+    return {
+        Language(language): [model.construct(**{**entry, "language": Language(entry["language"])}) for entry in entries]
+        for language, entries in data.items()
+    }
+
+
+def load_snapshot(path: str, raw_files: dict[str, bytes]) -> Optional[Content]:
+    """
+    Returns the content stored in the snapshot if it was made from exactly these data files. The compressed
+    payloads of the snapshot come with it, so that the Site built from it doesn't need to compress them again.
+    """
+    snapshot = read_snapshot(path, fingerprint(raw_files))
+    if snapshot is None:
+        return None
+
+    sections = {name: section_from_snapshot(SECTION_MODELS[name], snapshot["sections"][name]) for name in SECTION_MODELS}
+    return Content(elements_from_snapshot(snapshot["elements"]), sections, version=1, compressed=snapshot["compressed"])
+
+
+def write_snapshot(storage: Storage, path: str) -> dict:
+    """Validates the content the slow way and writes it to path together with all payloads built from it"""
+    store = ContentStore(storage)
+    content = store.content
+    site = Site(content, load_index_template(), ImageVariants("public/images"))
+
+    compressed = {}
+    for response in site.responses():
+        compressed[response.digest] = {encoding: body for encoding, (body, _) in response.variants.items() if encoding}
+    raw_files = {name: store.read(name)[2] for name in DATA_FILES}
+
+    snapshot = {
+        "fingerprint": fingerprint(raw_files),
+        # marshal only handles the builtin types, so the models are stored the way they would be sent
+        "elements": [json.loads(element.json()) for element in content.elements.values()],
+        "sections": {
+            section: {language.value: [json.loads(entry.json()) for entry in entries[language]] for language in entries}
+            for section, entries in content.sections.items()
+        },
+        "compressed": compressed,
+    }
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as file:
+        marshal.dump(snapshot, file)
+    # Workers starting at the same time must never read a half-written snapshot
+    os.replace(temporary_path, path)
+    return snapshot
+
+
+# Run `python -m snapshot` after the content, the images or index.html changed, so that starting the app doesn't
+# need to validate and compress everything again. A snapshot that doesn't match the content is simply ignored.
+if __name__ == "__main__":
+    content_directory = os.environ.get("CV_CONTENT_DIRECTORY", "content")
+    snapshot_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(content_directory, "snapshot.marshal")
+    written = write_snapshot(open_storage(os.environ.get("CV_CONTENT_STORAGE", content_directory)), snapshot_path)
+    print(f"Wrote {snapshot_path} ({os.path.getsize(snapshot_path)} bytes, {len(written['compressed'])} payloads)")
@@ -0,0 +1,140 @@
+import logging
+import mimetypes
+import os
+import sys
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from cache import compress, preferred_encoding
+from fingerprint import load_manifest
+
+logger = logging.getLogger(__name__)
+
+# Images and fonts are compressed already, so only text-based formats get precompressed siblings
+COMPRESSIBLE_EXTENSIONS = {".css", ".html", ".ico", ".js", ".json", ".map", ".svg", ".txt", ".webmanifest"}
+SIBLING_EXTENSIONS = {"br": ".br", "gzip": ".gz"}
+
+# Fingerprinted assets never change under their name, documents have to be revalidated on every visit
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DOCUMENT_CACHE_CONTROL = "no-cache"
+
+
+def is_compressible(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in COMPRESSIBLE_EXTENSIONS
+
+
+def precompress_file(path: str) -> dict[str, str]:
+    """
+    Writes .br and .gz siblings next to path unless they are already up-to-date and returns the
+    siblings that exist afterwards. Siblings carry the modification time of their source, so any
+    change to the source (including it being replaced by an older file) makes them stale.
+    """
+    source_stat = os.stat(path)
+    siblings: dict[str, str] = {}
+    stale: list[str] = []
+    for encoding, extension in SIBLING_EXTENSIONS.items():
+        try:
+            if os.stat(path + extension).st_mtime_ns == source_stat.st_mtime_ns:
+                siblings[encoding] = path + extension
+                continue
+        except FileNotFoundError:
+            pass
+        stale.append(encoding)
+
+    if not stale:
+        return siblings
+
+    with open(path, "rb") as file:
+        variants = compress(file.read())
+    for encoding in stale:
+        sibling = path + SIBLING_EXTENSIONS[encoding]
+        if encoding not in variants:
+            # Not worth it (or brotli is not installed), make sure no outdated sibling is left behind
+            if os.path.exists(sibling):
+                os.remove(sibling)
+            continue
+        with open(sibling, "wb") as file:
+            file.write(variants[encoding])
+        os.utime(sibling, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        siblings[encoding] = sibling
+    return siblings
+
+
+def precompress_directory(directory: str) -> dict[str, dict[str, str]]:
+    """Precompresses every compressible file below directory, returns the siblings per source file"""
+    index: dict[str, dict[str, str]] = {}
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            if not is_compressible(path):
+                continue
+            try:
+                siblings = precompress_file(path)
+            except OSError as error:
+                logger.warning("Could not precompress %s: %s", path, error)
+                continue
+            if siblings:
+                index[os.path.realpath(path)] = siblings
+    return index
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that answers with the .br or .gz sibling of a file if the client accepts it. The
+    siblings are created once when the app starts (or beforehand by running `python -m static public`)
+    and never while serving a request.
+    """
+
+    def __init__(self, *, directory: str, **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        self.siblings = precompress_directory(directory)
+        # Written by `python -m fingerprint public`, see fingerprint.py
+        self.fingerprinted = {
+            os.path.realpath(os.path.join(directory, url.lstrip("/"))) for url in load_manifest(directory).values()
+        }
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        # StaticFiles resolves the path with realpath already, just like the keys of the indexes
+        full_path = str(full_path)
+        response: Optional[Response] = None
+
+        siblings = self.siblings.get(full_path)
+        if siblings:
+            encoding = preferred_encoding(request_headers.get("accept-encoding", ""), siblings)
+            if encoding is not None:
+                sibling = siblings[encoding]
+                try:
+                    sibling_stat = os.stat(sibling)
+                except FileNotFoundError:
+                    sibling_stat = None
+                if sibling_stat is not None and sibling_stat.st_mtime_ns == stat_result.st_mtime_ns:
+                    response = FileResponse(
+                        sibling,
+                        status_code=status_code,
+                        stat_result=sibling_stat,
+                        media_type=mimetypes.guess_type(full_path)[0] or "text/plain",
+                        headers={"Content-Encoding": encoding},
+                    )
+
+        if response is None:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        if is_compressible(full_path):
+            response.headers["Vary"] = "Accept-Encoding"
+        if full_path in self.fingerprinted:
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        elif full_path.endswith(".html"):
+            response.headers["Cache-Control"] = DOCUMENT_CACHE_CONTROL
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+if __name__ == "__main__":
+    for source, variants in precompress_directory(sys.argv[1] if len(sys.argv) > 1 else "public").items():
+        print(source, ", ".join(sorted(variants)))
@@ -0,0 +1,207 @@
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Hashable, Iterator, Optional, Union
+
+from content import DATA_FILES, parse_data_file
+
+SQLITE_PREFIX = "sqlite:"
+
+# Every data file is one row holding its JSON, so an admin tool can edit the content with a plain UPDATE. The
+# triggers count every change in storage_version and stamp the changed rows with it, which tells a reader whether
+# anything changed with a single query, no matter which connection or process made the change.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS data_files (
+    name TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    revision INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS storage_version (version INTEGER NOT NULL);
+INSERT INTO storage_version SELECT 0 WHERE NOT EXISTS (SELECT * FROM storage_version);
+CREATE TRIGGER IF NOT EXISTS data_file_inserted AFTER INSERT ON data_files BEGIN
+    UPDATE storage_version SET version = version + 1;
+    UPDATE data_files SET revision = (SELECT version FROM storage_version) WHERE name = NEW.name;
+END;
+CREATE TRIGGER IF NOT EXISTS data_file_updated AFTER UPDATE OF data ON data_files BEGIN
+    UPDATE storage_version SET version = version + 1;
+    UPDATE data_files SET revision = (SELECT version FROM storage_version) WHERE name = NEW.name;
+END;
+"""
+
+
+# A storage holds the raw data files of content.py. It tells which version of every data file it holds with
+# stamps(), which has to be cheap as it is called every few seconds, and returns a data file together with the
+# stamp of exactly that version with read(). Validating and caching the content is left to the ContentStore.
+
+
+class FileStorage:
+    """The data files as JSON files inside of a directory, e.g. content/experiences.json"""
+
+    def __init__(self, directory: str = "content"):
+        self.directory = directory
+
+    def describe(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.json")
+
+    def close(self):
+        pass
+
+    def stamps(self) -> dict[str, Hashable]:
+        stamps = {}
+        for name in DATA_FILES:
+            try:
+                stat_result = os.stat(self.describe(name))
+            except FileNotFoundError:
+                continue
+            stamps[name] = (stat_result.st_mtime_ns, stat_result.st_size)
+        return stamps
+
+    def read(self, name: str) -> tuple[Hashable, bytes]:
+        with open(self.describe(name), "rb") as file:
+            stat_result = os.fstat(file.fileno())
+            return (stat_result.st_mtime_ns, stat_result.st_size), file.read()
+
+
+class ConnectionPool:
+    """
+    Hands out up to size connections to one SQLite database, each one to a single thread at a time. They are
+    opened on first use and kept open, as opening a connection costs more than most of the queries made with it.
+    """
+
+    def __init__(self, path: str, size: int = 4):
+        self.path = path
+        self.size = size
+        self.idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self.opened = 0
+        # The process the connections were opened in and the idle connections left over from the parent process
+        self.pid = os.getpid()
+        self.inherited: Optional[queue.LifoQueue[sqlite3.Connection]] = None
+        self._lock = threading.Lock()
+
+    def open(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+        # Readers don't wait for an admin tool that is writing and vice versa
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def check_process(self):
+        """
+        A connection must never be used by two processes, serve.py forks the workers after loading the content.
+        The inherited connections are kept (not closed), closing them could disturb the ones of the parent.
+        """
+        if self.pid != os.getpid():
+            with self._lock:
+                if self.pid != os.getpid():
+                    self.inherited, self.idle, self.opened, self.pid = self.idle, queue.LifoQueue(), 0, os.getpid()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        self.check_process()
+        try:
+            connection = self.idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self.opened < self.size
+                self.opened += can_open
+            connection = self.open() if can_open else self.idle.get()
+        try:
+            yield connection
+        finally:
+            self.idle.put(connection)
+
+    def close(self):
+        """Closes the idle connections opened by this process, the ones in use are closed with the process"""
+        self.check_process()
+        while True:
+            try:
+                connection = self.idle.get_nowait()
+            except queue.Empty:
+                return
+            connection.close()
+            # The pool stays usable, connections are opened again when needed
+            with self._lock:
+                self.opened -= 1
+
+
+class SQLiteStorage:
+    """
+    The data files as rows of an SQLite database. Whether anything changed is answered from the storage version
+    alone, the stamps of the single data files are only queried again once it moved on.
+    """
+
+    def __init__(self, path: str, pool_size: int = 4):
+        self.path = path
+        self.pool = ConnectionPool(path, pool_size)
+        self._version = None
+        self._stamps: dict[str, Hashable] = {}
+        with self.pool.connection() as connection:
+            connection.executescript(SCHEMA)
+
+    def describe(self, name: str) -> str:
+        return f"{name} in {self.path}"
+
+    def close(self):
+        self.pool.close()
+
+    def stamps(self) -> dict[str, Hashable]:
+        with self.pool.connection() as connection:
+            (version,) = connection.execute("SELECT version FROM storage_version").fetchone()
+            if version != self._version:
+                self._stamps = dict(connection.execute("SELECT name, revision FROM data_files"))
+                self._version = version
+        return self._stamps
+
+    def read(self, name: str) -> tuple[Hashable, bytes]:
+        with self.pool.connection() as connection:
+            row = connection.execute("SELECT revision, data FROM data_files WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"There is no data file {self.describe(name)}")
+        return row[0], row[1].encode("utf-8")
+
+    def write(self, files: dict[str, bytes]):
+        """Replaces the given data files in a single transaction, running apps pick them up like edited files"""
+        with self.pool.connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.executemany(
+                    "INSERT INTO data_files (name, data) VALUES (?, ?) "
+                    "ON CONFLICT (name) DO UPDATE SET data = excluded.data",
+                    [(name, raw.decode("utf-8")) for name, raw in files.items()],
+                )
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+
+Storage = Union[FileStorage, SQLiteStorage]
+
+
+def open_storage(location: str) -> Storage:
+    """Opens sqlite:<path> as an SQLite database and everything else as a directory of JSON files"""
+    if location.startswith(SQLITE_PREFIX):
+        return SQLiteStorage(location[len(SQLITE_PREFIX):])
+    return FileStorage(location)
+
+
+def import_data_files(source: Storage, destination: SQLiteStorage) -> list[str]:
+    """Copies every data file of source into destination, nothing is written unless all of them are valid"""
+    files = {name: source.read(name)[1] for name in DATA_FILES}
+    for name, raw in files.items():
+        parse_data_file(name, json.loads(raw))
+    destination.write(files)
+    return sorted(files)
+
+
+# Run `python -m storage import content sqlite:content.db` to fill a database with the content of the JSON files
+# (or of another database) and point CV_CONTENT_STORAGE at it. Changes to the database show up in running apps
+# within CV_CONTENT_RELOAD_INTERVAL, like changes to the JSON files do.
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] != "import" or not sys.argv[3].startswith(SQLITE_PREFIX):
+        sys.exit(f"Usage: python -m storage import <directory or {SQLITE_PREFIX}path> {SQLITE_PREFIX}<path>")
+    imported = import_data_files(open_storage(sys.argv[2]), open_storage(sys.argv[3]))
+    print(f"Imported {', '.join(imported)} into {sys.argv[3][len(SQLITE_PREFIX):]}")
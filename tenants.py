@@ -0,0 +1,240 @@
+import asyncio
+import json
+import logging
+import os
+import re
+from collections import OrderedDict
+from typing import Optional
+
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import PlainTextResponse, RedirectResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from cache import CachedResponse
+from content import Content, ContentStore
+from db import PersonalData
+from images import ImageVariants
+from printable import PrintCache
+from render import DEFAULT_PROFILE, Profile
+from serviceworker import ServiceWorker
+from storage import FileStorage
+from website import Site, load_index_template
+
+logger = logging.getLogger(__name__)
+
+TENANT_CONFIG = "tenant.json"
+PATH_PREFIX = "/t/"
+# Tenant names end up in paths, so anything that could leave the tenants directory is not a tenant
+NAME_PATTERN = re.compile(r"^[a-z0-9][a-z0-9-]{0,62}$")
+
+
+class Tenant:
+    """
+    One CV: its content, the Site built from it, the service worker and printable documents that belong to
+    it and its personal data. The content is watched like the one of a single CV, see content.py.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            content_store: ContentStore,
+            index_template: str,
+            image_variants: ImageVariants,
+            precached_static_files: list[dict],
+            personal_data: Optional[PersonalData],
+            personal_data_secret: Optional[str],
+            print_directory: str,
+            profile: Profile = DEFAULT_PROFILE,
+    ):
+        self.name = name
+        self.profile = profile
+        self.content_store = content_store
+        self.index_template = index_template
+        self.image_variants = image_variants
+        self.precached_static_files = precached_static_files
+        self.site = Site(content_store.content, index_template, image_variants, profile=profile)
+        self.service_worker = ServiceWorker(self.site, precached_static_files)
+        self.print_cache = PrintCache(print_directory)
+        # Must never be stored by shared caches, as it is only meant for the people who know the secret
+        self.personal_data_secret = personal_data_secret
+        self.personal_data_response = (
+            CachedResponse.from_content(personal_data, cache_control="private, no-store") if personal_data else None
+        )
+        content_store.subscribe(self.swap_site)
+
+    def swap_site(self, content: Content, changed: set[str]):
+        """Replaces the site once the new version is completely built, requests in flight keep the old one"""
+        site = Site(
+            content, self.index_template, self.image_variants, previous=self.site, changed=changed, profile=self.profile,
+        )
+        self.service_worker = ServiceWorker(site, self.precached_static_files)
+        self.site = site
+
+    @property
+    def size(self) -> int:
+        """The bytes of all serialized and compressed responses, which make up most of the memory of a tenant"""
+        responses = [*self.site.responses(), self.service_worker.manifest, self.service_worker.script]
+        return sum(len(body) for response in responses for body, _ in response.variants.values())
+
+
+class TenantRegistry:
+    """
+    The tenants in the subdirectories of directory, each one with the data files of content/ and a tenant.json
+    ({"hosts": […], "profile": {…}, "personal_data": {…}, "personal_data_secret": "…"}, all optional). The profile
+    names the owner of the CV and their links, see render.Profile. A tenant is loaded when
+    it is first requested and kept until the loaded tenants take up more than max_bytes, then the least recently
+    used ones are dropped. The default tenant serves every request that doesn't name another one and is never dropped.
+    """
+
+    def __init__(self, directory: str, default: Tenant, max_bytes: int, **shared):
+        self.directory = directory
+        self.default = default
+        self.max_bytes = max_bytes
+        # The index template, image variants and precached static files, the same for every tenant
+        self.shared = shared
+        self.tenants: OrderedDict[str, Tenant] = OrderedDict()
+        self.loading: dict[str, asyncio.Future] = {}
+        self.hosts = self.read_hosts()
+
+    def config_path(self, name: str) -> str:
+        return os.path.join(self.directory, name, TENANT_CONFIG)
+
+    def read_config(self, name: str) -> dict:
+        try:
+            with open(self.config_path(name), encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def read_hosts(self) -> dict[str, str]:
+        """Maps every host name in the tenant.json files to its tenant, only the small configs are read up front"""
+        hosts: dict[str, str] = {}
+        if not os.path.isdir(self.directory):
+            return hosts
+        for name in sorted(os.listdir(self.directory)):
+            if not self.exists(name):
+                continue
+            try:
+                config = self.read_config(name)
+            except ValueError as error:
+                logger.error("Ignoring the tenant %s, %s is invalid: %s", name, self.config_path(name), error)
+                continue
+            for host in config.get("hosts", []):
+                hosts[host.lower()] = name
+        return hosts
+
+    def exists(self, name: str) -> bool:
+        return NAME_PATTERN.match(name) is not None and os.path.isdir(os.path.join(self.directory, name))
+
+    def load(self, name: str) -> Tenant:
+        """Validates the content and personal data of a tenant and builds its site, runs in the threadpool"""
+        directory = os.path.join(self.directory, name)
+        config = self.read_config(name)
+        personal_data = None
+        if "personal_data" in config:
+            try:
+                personal_data = PersonalData(**config["personal_data"])
+            except ValidationError as error:
+                logger.warning("The personal data of the tenant %s is not available: %s", name, error)
+        # Only the links a tenant names are shown, the name defaults to the one of the tenant
+        profile = Profile(**{"name": name, **config.get("profile", {})})
+
+        index_path = os.path.join(directory, "index.html")
+        tenant = Tenant(
+            name,
+            ContentStore(FileStorage(directory)),
+            index_template=load_index_template(index_path) if os.path.exists(index_path) else self.shared["index_template"],
+            image_variants=self.shared["image_variants"],
+            precached_static_files=self.shared["precached_static_files"],
+            personal_data=personal_data,
+            personal_data_secret=config.get("personal_data_secret"),
+            print_directory=os.path.join(self.shared["print_directory"], name),
+            profile=profile,
+        )
+        logger.info("Loaded the tenant %s (%d bytes)", name, tenant.size)
+        return tenant
+
+    async def get(self, name: str) -> Tenant:
+        tenant = self.tenants.get(name)
+        if tenant is not None:
+            self.tenants.move_to_end(name)
+            return tenant
+
+        # Requests for a tenant that is being loaded wait for that instead of loading it again
+        loading = self.loading.get(name)
+        if loading is None:
+            loading = self.loading[name] = asyncio.ensure_future(run_in_threadpool(self.load, name))
+            loading.add_done_callback(lambda _: self.loading.pop(name, None))
+        tenant = await asyncio.shield(loading)
+        if name not in self.tenants:
+            self.tenants[name] = tenant
+            self.evict()
+        return self.tenants[name]
+
+    def evict(self):
+        total = sum(tenant.size for tenant in self.tenants.values())
+        while total > self.max_bytes and len(self.tenants) > 1:
+            name, tenant = self.tenants.popitem(last=False)
+            total -= tenant.size
+            logger.info("Dropped the tenant %s to stay below %d bytes", name, self.max_bytes)
+
+    async def watch(self, interval: float):
+        """Checks the data files of the loaded tenants for changes every interval seconds"""
+        while True:
+            await asyncio.sleep(interval)
+            for tenant in list(self.tenants.values()):
+                try:
+                    await asyncio.to_thread(tenant.content_store.reload)
+                except Exception:
+                    logger.exception("Reloading the content of the tenant %s failed", tenant.name)
+
+
+class TenantMiddleware:
+    """
+    Puts the tenant a request is meant for into its scope: the one named by a /t/<name>/ prefix (which is
+    then moved from the path to the root path), the one the Host header belongs to, or the default tenant.
+    """
+
+    def __init__(self, app: ASGIApp, registry: TenantRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        name = None
+        path: str = scope["path"]
+        if path.startswith(PATH_PREFIX):
+            name, slash, rest = path[len(PATH_PREFIX):].partition("/")
+            if not self.registry.exists(name):
+                await PlainTextResponse("Not Found", status_code=404)(scope, receive, send)
+                return
+            if not slash:
+                # The page refers to the API with relative URLs, which only resolve below the tenant with the slash
+                query = scope.get("query_string", b"").decode("latin-1")
+                await RedirectResponse(path + "/" + (f"?{query}" if query else ""), status_code=308)(scope, receive, send)
+                return
+            prefix = PATH_PREFIX + name
+            scope = {
+                **scope,
+                "path": "/" + rest,
+                "raw_path": (scope.get("raw_path") or path.encode())[len(prefix):],
+                "root_path": scope.get("root_path", "") + prefix,
+            }
+        else:
+            host = next((value for key, value in scope["headers"] if key == b"host"), b"").decode("latin-1")
+            name = self.registry.hosts.get(host.rsplit(":", 1)[0].lower())
+
+        if name is None:
+            scope["tenant"] = self.registry.default
+        else:
+            try:
+                scope["tenant"] = await self.registry.get(name)
+            except Exception:
+                logger.exception("Could not load the tenant %s", name)
+                await PlainTextResponse("Service Unavailable", status_code=503)(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
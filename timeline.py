@@ -0,0 +1,142 @@
+import calendar
+import logging
+import re
+from bisect import bisect_left, bisect_right
+from datetime import date
+from itertools import accumulate
+from typing import NamedTuple, Optional
+
+from cache import LRUCache, dump_json
+from db import Language
+from sections import SectionIndex
+
+logger = logging.getLogger(__name__)
+
+TIMELINE_SECTIONS = ("experiences", "education", "volunteering")
+
+MONTHS = {
+    name: number
+    for names in (
+        ("january", "february", "march", "april", "may", "june", "july", "august", "september", "october",
+         "november", "december"),
+        ("januar", "februar", "märz", "april", "mai", "juni", "juli", "august", "september", "oktober",
+         "november", "dezember"),
+        ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"),
+        ("jan", "feb", "mär", "apr", "mai", "jun", "jul", "aug", "sep", "okt", "nov", "dez"),
+    )
+    for number, name in enumerate(names, start=1)
+}
+MONTHS["maerz"] = 3
+MONTHS["sept"] = 9
+
+# End dates that mean the entry is still going on
+OPEN_ENDS = {"today", "present", "now", "current", "ongoing", "heute", "jetzt", "aktuell", "laufend", "bis heute"}
+
+MONTH_YEAR_PATTERN = re.compile(r"^(?P<month>[^\W\d_]+)\.?\s+(?P<year>\d{4})$")
+NUMERIC_PATTERN = re.compile(r"^(?:(?P<month>\d{1,2})[./])?(?P<year>\d{4})$")
+QUERY_PATTERN = re.compile(r"^(?P<year>\d{4})(?:-(?P<month>\d{2})(?:-(?P<day>\d{2}))?)?$")
+
+
+class Period(NamedTuple):
+    """The days an entry covers, an open end is represented by date.max"""
+    start: date
+    end: date
+
+    @property
+    def is_open(self) -> bool:
+        return self.end == date.max
+
+
+def month_bounds(year: int, month: Optional[int], end: bool) -> date:
+    """A year or a month stands for its first day at the start and its last day at the end of a period"""
+    if month is None:
+        month = 12 if end else 1
+    return date(year, month, calendar.monthrange(year, month)[1] if end else 1)
+
+
+def parse_date(text: str, end: bool = False) -> date:
+    """Parses the free-form dates of the content: "September 2013", "Juli 2016", "2007", "09/2013", "today", …"""
+    normalized = " ".join(text.strip().lower().split())
+    if end and normalized in OPEN_ENDS:
+        return date.max
+
+    match = MONTH_YEAR_PATTERN.match(normalized)
+    if match is not None and match.group("month") in MONTHS:
+        return month_bounds(int(match.group("year")), MONTHS[match.group("month")], end)
+
+    match = NUMERIC_PATTERN.match(normalized)
+    if match is not None:
+        month = int(match.group("month")) if match.group("month") else None
+        if month is None or 1 <= month <= 12:
+            return month_bounds(int(match.group("year")), month, end)
+    raise ValueError(f"Could not parse the date {text!r}")
+
+
+def parse_period(start: str, end: str) -> Period:
+    period = Period(parse_date(start), parse_date(end, end=True))
+    if period.end < period.start:
+        raise ValueError(f"The period {start!r} — {end!r} ends before it starts")
+    return period
+
+
+def parse_query_date(text: str, end: bool = False) -> date:
+    """Parses the from and to parameters, which are ISO dates that may leave out the day or the month"""
+    match = QUERY_PATTERN.match(text.strip())
+    if match is None:
+        raise ValueError("Dates have to be given as YYYY, YYYY-MM or YYYY-MM-DD")
+    year = int(match.group("year"))
+    month = int(match.group("month")) if match.group("month") else None
+    if match.group("day"):
+        return date(year, month, int(match.group("day")))
+    if month is not None and not 1 <= month <= 12:
+        raise ValueError(f"{month} is not a month")
+    return month_bounds(year, month, end)
+
+
+def format_date(value: date) -> Optional[str]:
+    return None if value == date.max else value.strftime("%Y-%m")
+
+
+class Timeline:
+    """
+    The entries of all dated sections in one language, sorted by when they started. Next to the starts, the
+    running maximum of the ends is kept, which never decreases, so both ends of a date range are found by
+    binary search. Every entry is serialized once when the timeline is built.
+    """
+
+    def __init__(self, language: Language, sections: dict[tuple[str, Language], SectionIndex]):
+        entries: list[tuple[Period, str, int, bytes]] = []
+        for section in TIMELINE_SECTIONS:
+            for position, document in enumerate(sections[section, language].documents):
+                try:
+                    period = parse_period(document["start_date"], document["end_date"])
+                except ValueError as error:
+                    logger.warning("Leaving %s %d (%s) out of the timeline: %s", section, position, language.value, error)
+                    continue
+                serialized = dump_json({
+                    "section": section,
+                    "index": position,
+                    "start": format_date(period.start),
+                    "end": format_date(period.end),
+                    **document,
+                })
+                entries.append((period, section, position, serialized))
+        # Ties are broken by the section and the position in it, so the order never depends on the content files
+        entries.sort(key=lambda entry: (entry[0].start, entry[0].end, TIMELINE_SECTIONS.index(entry[1]), entry[2]))
+
+        self.periods = [entry[0] for entry in entries]
+        self.serialized = [entry[3] for entry in entries]
+        self.starts = [period.start for period in self.periods]
+        self.running_ends = list(accumulate((period.end for period in self.periods), max))
+        self.results = LRUCache(maxsize=256)
+
+    def between(self, start: date = date.min, end: date = date.max) -> bytes:
+        """Returns the serialized entries that overlap the days from start to end (inclusive), oldest first"""
+        return self.results.get_or_build((start, end), lambda: self.build_between(start, end))
+
+    def build_between(self, start: date, end: date) -> bytes:
+        # Every entry before first ended before start, every entry from last on starts after end
+        first = bisect_left(self.running_ends, start)
+        last = bisect_right(self.starts, end)
+        selected = [self.serialized[index] for index in range(first, last) if self.periods[index].end >= start]
+        return b"[" + b",".join(selected) + b"]"
@@ -0,0 +1,109 @@
+from typing import Optional
+
+from cache import CachedResponse, precompressed
+from content import SECTION_MODELS, Content
+from db import Language
+from images import ImageVariants
+from language_kit import LanguageKit
+from render import DEFAULT_PROFILE, Profile, personalize_template, render_cv, render_page
+from search import SearchIndex
+from sections import SectionIndex
+from timeline import Timeline
+
+# The order in which the sections appear inside of a bundle
+BUNDLE_SECTIONS = ("elements", *SECTION_MODELS)
+
+
+def load_index_template(path: str = "public/index.html") -> str:
+    with open(path, encoding="utf-8") as index_file:
+        return index_file.read()
+
+
+class Site:
+    """
+    Everything that is served from one version of the content, serialized ahead of time. The data does not
+    change while a Site exists, so there is no reason to let FastAPI encode it again on every request.
+    """
+
+    def __init__(
+            self,
+            content: Content,
+            index_template: str,
+            image_variants: ImageVariants,
+            previous: Optional["Site"] = None,
+            changed: Optional[set[str]] = None,
+            profile: Profile = DEFAULT_PROFILE,
+    ):
+        self.content = content
+        self.profile = profile
+        self.index_template = personalize_template(index_template, profile)
+        self.image_variants = image_variants
+
+        token = precompressed.set(content.compressed)
+        try:
+            self.build(previous, changed)
+        finally:
+            precompressed.reset(token)
+
+    def build(self, previous: Optional["Site"], changed: Optional[set[str]]):
+        """Serializes and compresses everything, compressed payloads of the content are used instead of compressing"""
+        content = self.content
+
+        # Unchanged data files are taken over from the previous version instead of serializing them again
+        def reuse(name: str) -> bool:
+            return previous is not None and changed is not None and name not in changed
+
+        self.language_kits: dict[Language, LanguageKit] = (
+            previous.language_kits if reuse("elements")
+            else {language: LanguageKit(language, content.elements) for language in Language}
+        )
+
+        self.sections: dict[tuple[str, Language], SectionIndex] = {}
+        self.payloads: dict[tuple[str, Language], CachedResponse] = {}
+        for language in Language:
+            self.payloads["elements", language] = self.language_kits[language].response
+            for section, entries in content.sections.items():
+                if reuse(section):
+                    self.sections[section, language] = previous.sections[section, language]
+                else:
+                    self.sections[section, language] = SectionIndex(SECTION_MODELS[section], entries[language])
+                self.payloads[section, language] = self.sections[section, language].response
+            self.payloads["bundle", language] = self.build_bundle(language, BUNDLE_SECTIONS)
+            self.payloads["page", language] = self.build_page(language)
+
+        # Searching has to be answered from memory, so the inverted index is built together with everything else
+        self.search_indexes: dict[Language, SearchIndex] = {language: SearchIndex(content, language) for language in Language}
+
+        # The dated entries of all sections in chronological order, for date-range queries
+        self.timelines: dict[Language, Timeline] = {language: Timeline(language, self.sections) for language in Language}
+
+        # Bundles restricted to a subset of the sections, built on first use, there are only 31 possible subsets
+        self.filtered_bundles: dict[tuple[Language, tuple[str, ...]], CachedResponse] = {}
+
+    def responses(self) -> list[CachedResponse]:
+        """All responses that are built together with the site, e.g. to include them in a snapshot"""
+        highlighted = [index.highlighted for index in self.sections.values() if index.highlighted is not None]
+        return [*self.payloads.values(), *highlighted]
+
+    def build_bundle(self, language: Language, selected: tuple[str, ...]) -> CachedResponse:
+        """Stitches the already serialized sections together into one JSON object without re-encoding them"""
+        members = [b'"%s":%s' % (section.encode(), self.payloads[section, language].body) for section in selected]
+        return CachedResponse(b"{" + b",".join(members) + b"}")
+
+    def filtered_bundle(self, language: Language, selected: tuple[str, ...]) -> CachedResponse:
+        bundle = self.filtered_bundles.get((language, selected))
+        if bundle is None:
+            bundle = self.filtered_bundles[language, selected] = self.build_bundle(language, selected)
+        return bundle
+
+    def build_page(self, language: Language) -> CachedResponse:
+        """Renders index.html with the complete CV and the bundle Vue needs to take over"""
+        markup = render_cv(
+            language,
+            self.language_kits[language].elements,
+            {section: entries[language] for section, entries in self.content.sections.items()},
+            self.profile,
+        )
+        initial_data = b'{"language":"%s",%s' % (language.value.encode(), self.payloads["bundle", language].body[1:])
+        page = self.image_variants.add_srcsets(render_page(self.index_template, language, markup, initial_data))
+        return CachedResponse(page.encode("utf-8"), media_type="text/html; charset=utf-8")